@@ -1,55 +1,400 @@
+import time
+
+# Recorded before the heavy imports below so startup_ms covers them
+_start_time = time.perf_counter()
+
 from flask import Flask, request, jsonify
-import pandas as pd
 import os
+import json
+import gzip
+import hashlib
 import datetime
 import sys
+import threading
 from scrape import (
-    extract_steam_id, get_steam_username, get_steam_games,
-    get_game_info, match_games_with_compatibility
+    extract_steam_id, get_steam_username, iter_steam_games,
+    get_game_info, CompatibilityCache, MatchCache, explain_matches, match_result, SteamLibraryIncomplete
+)
+from storage import as_dicts, STATUS_FIELDS
+from store import ensure_store, search_games, stage_store, install_store, store_filename_for
+from history import (
+    history_filename_for, record_snapshot, list_versions, diff_versions, changes_since
 )
+from export import save_rows
+from profiles import check_profile, load_profile, profiles_filename_for, affected_profiles
+from summary import summarize_games, summarize_libraries
+from ratelimit import RateLimitExceeded, get_rate_limiter
+from refresher import ScheduledRefresher, RefreshInProgress, parse_window
+from readiness import READY_MARKER
 
 app = Flask(__name__)
 
 # Get the directory where the script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
-CSV_FILENAME = os.path.join(script_dir, "macludus_compatible_games.csv")
-WIKI_URL = "https://www.applegamingwiki.com/wiki/M1_compatible_games_master_list"
+# Data files live next to the script unless MACLUDUS_DATA_DIR says otherwise
+data_dir = os.environ.get("MACLUDUS_DATA_DIR", script_dir)
+CSV_FILENAME = os.path.join(data_dir, "macludus_compatible_games.csv")
+WIKI_URL = os.environ.get("MACLUDUS_WIKI_URL",
+                          "https://www.applegamingwiki.com/wiki/M1_compatible_games_master_list")
+
+# Loaded and indexed compatibility data, shared across requests
+compatibility_cache = CompatibilityCache()
+
+# Ranked match candidates shared across users; replaced in run() when persisted
+match_cache = MatchCache()
+
+# Filled in once the server is listening, reported by /health
+backend_info = {"ready": False, "port": None, "startup_ms": None}
+
+# Scheduled database refresher, if enabled in run()
+refresher = None
+
+# Held while the database is being refreshed, so a manual update and a
+# scheduled one never scrape the wiki at the same time
+refresh_lock = threading.Lock()
+
+# Seconds to wait on shutdown for a scheduled refresh in progress to finish
+REFRESH_STOP_TIMEOUT = 60
+
+# JSON responses at least this large are compressed when the client accepts it
+COMPRESS_MIN_SIZE = 1024
+
+# brotli is optional; None until first checked, then the module or False
+_brotli = None
+
+def brotli_module():
+    """Return the brotli module if it is installed, else None."""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli or None
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses with brotli or gzip, whichever the client prefers."""
+    if (response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or response.mimetype != 'application/json'):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encodings = request.accept_encodings
+    brotli = brotli_module()
+    if brotli and encodings['br'] and encodings['br'] >= encodings['gzip']:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif encodings['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def database_etag(*parts):
+    """
+    ETag for a response that depends only on the compatibility database and
+    the given request parameters. Rewriting the database changes its
+    modification time and therefore every tag derived from it.
+    """
+    mtime = os.path.getmtime(CSV_FILENAME) if os.path.exists(CSV_FILENAME) else None
+    return hashlib.sha1(json.dumps([mtime, *parts], default=str).encode('utf-8')).hexdigest()
+
+def history_etag(*parts):
+    """
+    ETag for a response read from the history database. Writers record the
+    history version after rewriting the CSV, so the history file's
+    modification time is part of the tag as well.
+    """
+    history_filename = history_filename_for(CSV_FILENAME)
+    history_mtime = os.path.getmtime(history_filename) if os.path.exists(history_filename) else None
+    return database_etag(*parts, history_mtime)
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds etag, else None."""
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return None
+
+def with_etag(response, etag):
+    """
+    Tag a response so clients revalidate it instead of downloading it again.
+    Tags are weak because the body may be sent with different encodings.
+    """
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def rate_limited(error):
+    """Response for a request that couldn't get an upstream rate limit token in time."""
+    response = jsonify({"error": str(error), "retry_after": round(error.retry_after)})
+    response.headers['Retry-After'] = str(max(1, round(error.retry_after)))
+    return response, 503
+
+@app.route('/health', methods=['GET'])
+def health():
+    """
+    Report whether the backend is ready, which port it uses, how long startup
+    took, and the state of the scheduled database refresher.
+    """
+    return jsonify(dict(backend_info, refresh=refresher.state if refresher else {"enabled": False}))
 
 @app.route('/database-status', methods=['GET'])
 def database_status():
     """Check if the database exists and return its last update time."""
+    etag = database_etag(request.path)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     if os.path.exists(CSV_FILENAME):
         last_update = datetime.datetime.fromtimestamp(os.path.getmtime(CSV_FILENAME))
-        return jsonify({
+        response = jsonify({
             "exists": True,
             "last_updated": last_update.strftime('%Y-%m-%d')
         })
     else:
-        return jsonify({
+        response = jsonify({
             "exists": False,
             "last_updated": None
         })
+    return with_etag(response, etag)
+
+def refresh_database():
+    """
+    Scrape the Apple Gaming Wiki and swap the new database in. Requests keep
+    using the previous database until the new one is loaded and indexed.
+    Returns (game_count, history version), or (0, None) if nothing was extracted.
+    Raises RefreshInProgress rather than waiting if a refresh is already running.
+    """
+    if not refresh_lock.acquire(blocking=False):
+        raise RefreshInProgress("A database refresh is already in progress")
+    try:
+        games = get_game_info(WIKI_URL)
+        if not games:
+            return 0, None
+
+        # The search store and the history version are prepared before the new
+        # CSV is swapped in, so a request never finds the store out of date
+        # and rebuilds it itself
+        store_filename = store_filename_for(CSV_FILENAME)
+        staged_store, _ = stage_store(store_filename, games)
+        try:
+            version = record_snapshot(history_filename_for(CSV_FILENAME), games)
+            compatibility_cache.replace(CSV_FILENAME, games)
+        except BaseException:
+            os.remove(staged_store)
+            raise
+        install_store(staged_store, store_filename, os.path.getmtime(CSV_FILENAME))
+        return len(games), version
+    finally:
+        refresh_lock.release()
+
+def scheduled_refresh():
+    """Refresh run by the scheduler; failures are raised so it can retry."""
+    game_count, version = refresh_database()
+    if not game_count:
+        raise ValueError("Failed to extract game information")
+    print(f"Scheduled refresh stored {game_count} games as version {version}")
+
+    if version > 1:
+        diff = diff_versions(history_filename_for(CSV_FILENAME), version - 1, version)
+        profiles = affected_profiles(profiles_filename_for(CSV_FILENAME), diff)
+        if profiles:
+            print(f"{len(profiles)} checked profiles own games changed in this update; see /history/affected")
 
 @app.route('/update-database', methods=['POST'])
 def update_database():
     """Update the compatibility database from Apple Gaming Wiki."""
     try:
-        games = get_game_info(WIKI_URL)
-        if games:
-            df = pd.DataFrame(games)
-            df.to_csv(CSV_FILENAME, index=False)
-            return jsonify({"message": "Database updated successfully", "game_count": len(games)})
+        game_count, version = refresh_database()
+        if game_count:
+            return jsonify({"message": "Database updated successfully", "game_count": game_count,
+                            "version": version})
         else:
             return jsonify({"error": "Failed to extract game information"}), 500
+    except RefreshInProgress as e:
+        return jsonify({"error": str(e)}), 409
+    except RateLimitExceeded as e:
+        return rate_limited(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/search', methods=['GET'])
+def search():
+    """
+    Look up games by name for single-game lookups and type-ahead.
+    Query parameters: q (the text typed so far), limit (default 20), and
+    optional status filters such as native=Yes.
+    """
+    query = request.args.get("q", "")
+    filters = {field: request.args[field] for field in STATUS_FIELDS if field in request.args}
+
+    if not query.strip() and not filters:
+        return jsonify({"error": "Search query is required"}), 400
+
+    if not os.path.exists(CSV_FILENAME):
+        return jsonify({"error": "Compatibility database not found"}), 500
+
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), 200)
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+
+    etag = database_etag(request.path, query, limit, filters)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    try:
+        results = search_games(ensure_store(CSV_FILENAME), query, limit, filters)
+        return with_etag(jsonify({"results": results, "count": len(results)}), etag)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/history', methods=['GET'])
+def history():
+    """List the stored versions of the compatibility database."""
+    etag = history_etag(request.path)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return with_etag(jsonify({"versions": list_versions(history_filename_for(CSV_FILENAME))}), etag)
+
+@app.route('/history/diff', methods=['GET'])
+def history_diff():
+    """
+    Diff two versions of the compatibility database.
+    Query parameters: from (required) and to (defaults to the latest version).
+    """
+    history_filename = history_filename_for(CSV_FILENAME)
+    versions = list_versions(history_filename)
+    if not versions:
+        return jsonify({"error": "No history recorded yet"}), 404
+
+    try:
+        old_version = int(request.args["from"])
+        new_version = int(request.args.get("to", versions[-1]["version"]))
+    except (KeyError, ValueError):
+        return jsonify({"error": "from (and optional to) must be version numbers"}), 400
+
+    known = {v["version"] for v in versions}
+    if old_version not in known or new_version not in known:
+        return jsonify({"error": "Unknown version"}), 404
+
+    etag = history_etag(request.path, old_version, new_version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return with_etag(jsonify(diff_versions(history_filename, old_version, new_version)), etag)
+
+@app.route('/history/changes', methods=['GET'])
+def history_changes():
+    """List the changes since a date. Query parameter: since (YYYY-MM-DD)."""
+    since = request.args.get("since")
+    try:
+        datetime.datetime.strptime(since or "", '%Y-%m-%d')
+    except ValueError:
+        return jsonify({"error": "since must be a date in YYYY-MM-DD format"}), 400
+
+    etag = history_etag(request.path, since)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    diff = changes_since(history_filename_for(CSV_FILENAME), since)
+    if diff is None:
+        return jsonify({"error": "No history recorded yet"}), 404
+    return with_etag(jsonify(diff), etag)
+
+@app.route('/history/affected', methods=['GET'])
+def history_affected():
+    """
+    List the checked profiles that own games changed or removed between two
+    versions, with the changes to each of their games.
+    Query parameters: from (defaults to the version before to) and to
+    (defaults to the latest version), or since (YYYY-MM-DD) instead of both.
+    """
+    history_filename = history_filename_for(CSV_FILENAME)
+    versions = list_versions(history_filename)
+    if not versions:
+        return jsonify({"error": "No history recorded yet"}), 404
+
+    since = request.args.get("since")
+    if since:
+        try:
+            datetime.datetime.strptime(since, '%Y-%m-%d')
+        except ValueError:
+            return jsonify({"error": "since must be a date in YYYY-MM-DD format"}), 400
+    else:
+        try:
+            new_version = int(request.args.get("to", versions[-1]["version"]))
+            old_version = int(request.args.get("from", new_version - 1))
+        except ValueError:
+            return jsonify({"error": "from and to must be version numbers"}), 400
+
+        known = {v["version"] for v in versions}
+        if old_version not in known or new_version not in known:
+            return jsonify({"error": "Unknown version"}), 404
+
+    # Profiles change whenever one is checked, so they are part of the tag
+    profiles_filename = profiles_filename_for(CSV_FILENAME)
+    profiles_mtime = os.path.getmtime(profiles_filename) if os.path.exists(profiles_filename) else None
+    etag = history_etag(request.path, since or [old_version, new_version], profiles_mtime)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    if since:
+        diff = changes_since(history_filename, since)
+    else:
+        diff = diff_versions(history_filename, old_version, new_version)
+    profiles = affected_profiles(profiles_filename, diff)
+    return with_etag(jsonify({
+        "from_version": diff["from_version"],
+        "to_version": diff["to_version"],
+        "changed_games": len(diff["changed"]) + len(diff["removed"]),
+        "profile_count": len(profiles),
+        "profiles": profiles,
+    }), etag)
+
+@app.route('/rate-limit/stats', methods=['GET'])
+def rate_limit_stats():
+    """Report queueing, rejections and 429s per upstream host, across all local processes."""
+    return jsonify(get_rate_limiter().stats())
+
+@app.route('/match-cache/stats', methods=['GET'])
+def match_cache_stats():
+    """Report hit-rate statistics for the shared match cache."""
+    return jsonify(match_cache.stats())
+
 @app.route('/check-compatibility', methods=['POST'])
 def check_compatibility():
-    """Check compatibility of games in the Steam profile."""
+    """
+    Check compatibility of games in the Steam profile.
+
+    The response is tagged with the database version, the request parameters
+    and the library it was matched against. A client that sends the tag back
+    in If-None-Match gets an empty 304 when nothing changed; the library is
+    still fetched to find that out, but the results aren't sent again.
+
+    With "explain": true, every game is ranked in full and annotated with how
+    it was matched (under "match"), and "trace" holds the time spent per
+    matching tier. Explained checks leave the stored profile results alone and
+    are never answered with a 304.
+    """
     data = request.json
     steam_profile = data.get("steam_profile")
     api_key = data.get("api_key", None)
+    full_recheck = bool(data.get("full_recheck", False))
+    explain = bool(data.get("explain", False))
 
     if not steam_profile:
         return jsonify({"error": "Steam profile URL is required"}), 400
@@ -58,8 +403,7 @@ def check_compatibility():
         return jsonify({"error": "Compatibility database not found"}), 500
 
     try:
-        compatibility_df = pd.read_csv(CSV_FILENAME)
-        compatibility_data = compatibility_df.to_dict('records')
+        compatibility_data, index = compatibility_cache.get(CSV_FILENAME)
 
         steam_id = extract_steam_id(steam_profile)
         if not steam_id:
@@ -70,25 +414,126 @@ def check_compatibility():
         if not steam_username:
             return jsonify({"error": "Could not fetch username for the provided Steam ID"}), 400
 
-        steam_games = get_steam_games(steam_id, api_key)
-        if not steam_games:
+        steam_games = (game['name'] for game in iter_steam_games(steam_id, api_key))
+
+        if explain:
+            assignments, explanations, timings = explain_matches(steam_games, index)
+            if not assignments:
+                return jsonify({"error": "No games found in the Steam library"}), 404
+            matched_games = [match_result(steam_game, match, compatibility_data)
+                             for steam_game, match in assignments]
+            results = as_dicts(matched_games)
+            for result, (steam_game, _), explanation in zip(results, assignments, explanations):
+                result["match"] = dict(explanation, steam_name=steam_game)
+            return jsonify({
+                "matched_games": results,
+                "username": steam_username,
+                "game_count": len(matched_games),
+                "trace": timings,
+                "summary": summarize_games(matched_games)
+            })
+
+        # The library is matched while it streams in; only games added since
+        # this profile's last check are matched
+        matched_games, recheck = check_profile(
+            profiles_filename_for(CSV_FILENAME), steam_id, steam_games, compatibility_data, index,
+            match_cache, full=full_recheck)
+        if not matched_games:
             return jsonify({"error": "No games found in the Steam library"}), 404
 
-        matched_games = match_games_with_compatibility(steam_games, compatibility_data)
-        return jsonify({
-            "matched_games": matched_games,
+        etag = hashlib.sha1(json.dumps(
+            [index.version, steam_id, full_recheck, steam_username, recheck["fingerprint"]]
+        ).encode('utf-8')).hexdigest()
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        return with_etag(jsonify({
+            "matched_games": as_dicts(matched_games),
             "username": steam_username,
-            "game_count": len(steam_games)
-        })
+            "game_count": len(matched_games),
+            "recheck": recheck,
+            "summary": summarize_games(matched_games)
+        }), etag)
+    except RateLimitExceeded as e:
+        return rate_limited(e)
+    except SteamLibraryIncomplete as e:
+        return jsonify({"error": str(e)}), 502
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/match/explain', methods=['GET'])
+def match_explain():
+    """
+    Show how a single Steam game name would be matched on its own: the tier,
+    score, runner-up candidates, entries scanned and time per tier.
+    Query parameters: name, and runner_ups (default 3).
+    """
+    name = request.args.get("name", "")
+    if not name.strip():
+        return jsonify({"error": "name is required"}), 400
+
+    try:
+        runner_ups = min(max(int(request.args.get("runner_ups", 3)), 0), 50)
+    except ValueError:
+        return jsonify({"error": "runner_ups must be a number"}), 400
+
+    if not os.path.exists(CSV_FILENAME):
+        return jsonify({"error": "Compatibility database not found"}), 500
+
+    compatibility_data, index = compatibility_cache.get(CSV_FILENAME)
+    assignments, explanations, timings = explain_matches([name], index, runner_ups=runner_ups)
+    _, match = assignments[0]
+    return jsonify({
+        "steam_name": name,
+        "result": dict(match_result(name, match, compatibility_data)),
+        "match": explanations[0],
+        "trace": timings,
+    })
+
+@app.route('/summary', methods=['GET'])
+def summary():
+    """
+    Summarize the libraries of one or more previously checked profiles, e.g.
+    /summary?steam_id=7656...&steam_id=7656... Only counts are returned, not
+    the matched games. Libraries are not refetched; they are rematched only if
+    the database changed since they were checked.
+    """
+    steam_ids = [steam_id for value in request.args.getlist('steam_id') for steam_id in value.split(',') if steam_id]
+    if not steam_ids:
+        return jsonify({"error": "At least one steam_id is required"}), 400
+
+    if not os.path.exists(CSV_FILENAME):
+        return jsonify({"error": "Compatibility database not found"}), 500
+
+    try:
+        compatibility_data, index = compatibility_cache.get(CSV_FILENAME)
+        profiles_filename = profiles_filename_for(CSV_FILENAME)
+
+        libraries = {}
+        for steam_id in steam_ids:
+            profile = load_profile(profiles_filename, steam_id)
+            if profile is None:
+                return jsonify({"error": f"Profile {steam_id} has not been checked yet"}), 404
+            steam_games = [steam_game for steam_game, _ in profile["assignments"]]
+            libraries[steam_id], _ = check_profile(
+                profiles_filename, steam_id, steam_games, compatibility_data, index, match_cache)
+
+        return jsonify(summarize_libraries(libraries))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/save-results', methods=['POST'])
 def save_results():
-    """Save the compatibility results to a CSV file."""
+    """
+    Save the compatibility results to a file. The format (csv, jsonl, xlsx,
+    parquet or arrow) comes from the optional "format" field, or else from the
+    file_path extension.
+    """
     data = request.json
     matched_games = data.get("matched_games")
     file_path = data.get("file_path")
+    file_format = data.get("format")
 
     # If no file path is provided, use a default path in the script directory
     if not file_path:
@@ -98,11 +543,83 @@ def save_results():
         return jsonify({"error": "No data to save"}), 400
 
     try:
-        df = pd.DataFrame(matched_games)
-        df.to_csv(file_path, index=False)
+        save_rows(file_path, matched_games, file_format)
         return jsonify({"message": f"Results saved to {file_path}"})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def run(host='127.0.0.1', port=5000, match_cache_filename=None, refresh_interval=None, refresh_jitter=0.0,
+        refresh_window=None):
+    """
+    Start the server: build the compatibility snapshot, bind the port (0 picks a
+    free one), then print the readiness line with the actual port and serve.
+    If match_cache_filename is given, the match cache is loaded from it at
+    startup and saved back on shutdown.
+
+    If refresh_interval (in seconds) is given, the database is refreshed in the
+    background that long after its last update, plus up to refresh_jitter
+    seconds, and only within refresh_window, a (start, end) pair of local
+    hours, if one is given.
+    """
+    global match_cache, refresher
+    import signal
+    from werkzeug.serving import make_server
+
+    if match_cache_filename:
+        match_cache = MatchCache(filename=match_cache_filename)
+
+    if os.path.exists(CSV_FILENAME):
+        compatibility_cache.get(CSV_FILENAME)
+
+    server = make_server(host, port, app, threaded=True)
+    backend_info.update({
+        "ready": True,
+        "port": server.server_port,
+        "startup_ms": round((time.perf_counter() - _start_time) * 1000)
+    })
+    print(f"{READY_MARKER} {json.dumps(backend_info)}", flush=True)
+
+    if refresh_interval:
+        refresher = ScheduledRefresher(scheduled_refresh, CSV_FILENAME, refresh_interval, refresh_jitter,
+                                       refresh_window)
+        refresher.start()
+
+    # Turn SIGTERM (sent by the Electron shell on quit) into a normal exit so the cache is saved
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if refresher:
+            refresher.stop(REFRESH_STOP_TIMEOUT)
+        match_cache.save(compatibility_cache.versions())
+
 if __name__ == '__main__':
-    app.run(port=5000)
+    import argparse
+
+    parser = argparse.ArgumentParser(description='MacLudus backend API')
+    parser.add_argument('--port', type=int, default=int(os.environ.get("MACLUDUS_PORT", 5000)),
+                        help='Port to listen on, 0 for any free port (default: $MACLUDUS_PORT or 5000)')
+    parser.add_argument('--match-cache', type=str, default=os.environ.get("MACLUDUS_MATCH_CACHE"),
+                        help='File to persist the match cache in between runs (default: $MACLUDUS_MATCH_CACHE)')
+    parser.add_argument('--refresh-interval', type=float, default=os.environ.get("MACLUDUS_REFRESH_INTERVAL"),
+                        help='Refresh the database in the background every this many hours '
+                             '(default: $MACLUDUS_REFRESH_INTERVAL, or never)')
+    parser.add_argument('--refresh-jitter', type=float, default=1.0,
+                        help='Delay each scheduled refresh by a random amount up to this many hours (default: 1)')
+    parser.add_argument('--refresh-window', type=str, default=os.environ.get("MACLUDUS_REFRESH_WINDOW"),
+                        help='Only refresh between these local hours, e.g. 2-6 '
+                             '(default: $MACLUDUS_REFRESH_WINDOW, or any time)')
+    args = parser.parse_args()
+
+    try:
+        refresh_window = parse_window(args.refresh_window)
+    except ValueError as e:
+        parser.error(str(e))
+
+    run(port=args.port, match_cache_filename=args.match_cache,
+        refresh_interval=args.refresh_interval * 3600 if args.refresh_interval else None,
+        refresh_jitter=args.refresh_jitter * 3600, refresh_window=refresh_window)
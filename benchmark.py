@@ -0,0 +1,319 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+import urllib.request
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+BENCHMARK_STATUSES = ['Yes', 'No', 'Partial', 'Unknown', 'Native', '']
+BENCHMARK_WORDS = [
+    'dark', 'souls', 'portal', 'city', 'legend', 'quest', 'star', 'war', 'craft', 'space',
+    'hollow', 'knight', 'dead', 'cells', 'stardew', 'valley', 'civilization', 'total', 'empire',
+    'racing', 'tactics', 'dungeon', 'island', 'ghost', 'shadow', 'iron', 'crystal', 'ocean'
+]
+
+
+def time_command(args, repeat=5):
+    """
+    Run a command in a fresh interpreter several times and return the
+    wall-clock duration of each run in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=script_dir, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def bench_import(module, repeat=5):
+    """Measure how long `import <module>` takes in a fresh interpreter."""
+    return time_command([sys.executable, '-c', f'import {module}'], repeat)
+
+
+def bench_cli_help(repeat=5):
+    """Measure how long `python scrape.py --help` takes."""
+    return time_command([sys.executable, os.path.join(script_dir, 'scrape.py'), '--help'], repeat)
+
+
+def bench_backend_first_response(repeat=3, timeout=30):
+    """
+    Start backend.py on a free port and measure the time until /database-status
+    answers. The backend reports its port on stdout once it is ready.
+    Returns a list of durations in milliseconds, one per backend start.
+    """
+    import json
+    from readiness import READY_MARKER
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(script_dir, 'backend.py'), '--port', '0'],
+                                   cwd=script_dir, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, text=True)
+        try:
+            port = None
+            for line in process.stdout:
+                if line.startswith(READY_MARKER):
+                    port = json.loads(line[len(READY_MARKER):])["port"]
+                    break
+            if port is None:
+                raise RuntimeError(f"Backend exited with code {process.wait()} before becoming ready")
+
+            url = f"http://127.0.0.1:{port}/database-status"
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                response.read()
+            timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            process.terminate()
+            process.wait()
+
+    return timings
+
+
+def make_benchmark_games(rows=10000, seed=0):
+    """Build synthetic compatibility rows with the same columns as get_game_info output."""
+    rng = random.Random(seed)
+    games = []
+    for i in range(rows):
+        name = ' '.join(rng.choice(BENCHMARK_WORDS).title() for _ in range(rng.randint(1, 4))) + f" {i}"
+        games.append({
+            'name': name,
+            'url': f"https://www.applegamingwiki.com/wiki/Game_{i}" if rng.random() < 0.9 else '',
+            'native': rng.choice(BENCHMARK_STATUSES),
+            'rosetta_2': rng.choice(BENCHMARK_STATUSES),
+            'crossover': rng.choice(BENCHMARK_STATUSES),
+            'wine': rng.choice(BENCHMARK_STATUSES),
+            'parallels': rng.choice(BENCHMARK_STATUSES),
+            'linux_arm': rng.choice(BENCHMARK_STATUSES),
+        })
+    return games
+
+
+def make_benchmark_dataset(filename, rows=10000, seed=0):
+    """
+    Write a synthetic compatibility database with the same columns as
+    get_game_info output. Returns the list of game names in the dataset.
+    """
+    from storage import write_csv_rows
+
+    games = make_benchmark_games(rows, seed)
+    write_csv_rows(filename, games)
+    return [game['name'] for game in games]
+
+
+def make_benchmark_library(dataset_names, size=100, seed=1):
+    """
+    Build a synthetic Steam library: mostly exact names from the dataset,
+    some edition variants, and some games the wiki doesn't know about.
+    """
+    rng = random.Random(seed)
+    library = []
+    for i in range(size):
+        roll = rng.random()
+        if roll < 0.6:
+            library.append(rng.choice(dataset_names))
+        elif roll < 0.8:
+            library.append(rng.choice(dataset_names) + " Deluxe Edition")
+        else:
+            library.append(f"Unlisted Game {i}")
+    return library
+
+
+def bench_load_match_save(dataset, library, repeat=3, use_pandas=False):
+    """
+    Measure load -> match -> save on a dataset file.
+    Returns (timings in milliseconds, peak traced memory in bytes).
+    """
+    from scrape import match_games_with_compatibility
+    from storage import load_compatibility_data, write_csv_rows
+
+    if use_pandas:
+        import pandas as pd
+
+    timings = []
+    peak = 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = os.path.join(temp_dir, 'results.csv')
+        for _ in range(repeat):
+            tracemalloc.start()
+            start = time.perf_counter()
+            if use_pandas:
+                compatibility_data = pd.read_csv(dataset).to_dict('records')
+                matched_games = match_games_with_compatibility(library, compatibility_data)
+                pd.DataFrame(matched_games).to_csv(output_file, index=False)
+            else:
+                compatibility_data = load_compatibility_data(dataset)
+                matched_games = match_games_with_compatibility(library, compatibility_data)
+                write_csv_rows(output_file, matched_games)
+            timings.append((time.perf_counter() - start) * 1000)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    return timings, peak
+
+
+def bench_match_cache(dataset, libraries):
+    """
+    Match several overlapping libraries against one indexed database, the way
+    the backend does, with and without the shared match cache.
+    Returns (uncached timings, cached timings, cache stats); timings in milliseconds.
+    """
+    from scrape import CompatibilityIndex, MatchCache, match_games_with_compatibility
+    from storage import load_compatibility_data
+
+    compatibility_data = load_compatibility_data(dataset)
+    index = CompatibilityIndex(compatibility_data)
+    match_cache = MatchCache()
+
+    results = []
+    for cache in (None, match_cache):
+        timings = []
+        for library in libraries:
+            start = time.perf_counter()
+            match_games_with_compatibility(library, compatibility_data, index, cache)
+            timings.append((time.perf_counter() - start) * 1000)
+        results.append(timings)
+
+    return results[0], results[1], match_cache.stats()
+
+
+def bench_resident_memory(dataset, library):
+    """
+    Measure the memory held by a loaded database plus one batch of match
+    results, with rows as plain dictionaries and as compact GameRecords.
+    Returns {label: bytes}.
+    """
+    import gc
+    from scrape import match_games_with_compatibility
+    from storage import iter_csv_rows, load_compatibility_data
+
+    loaders = [
+        ("dicts", lambda: list(iter_csv_rows(dataset))),
+        ("records", lambda: load_compatibility_data(dataset)),
+    ]
+
+    results = {}
+    for label, load in loaders:
+        gc.collect()
+        tracemalloc.start()
+        compatibility_data = load()
+        matched_games = match_games_with_compatibility(library, compatibility_data)
+        gc.collect()
+        results[label] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del compatibility_data, matched_games
+
+    return results
+
+
+def print_result(label, timings):
+    """Print the median, min and max of a list of timings."""
+    print(f"{label:<40} median {statistics.median(timings):8.1f} ms   "
+          f"min {min(timings):8.1f} ms   max {max(timings):8.1f} ms")
+
+
+def main():
+    """
+    Run the benchmarks and print a summary.
+
+    Usage examples:
+    - Run all benchmarks:
+      python benchmark.py
+
+    - Skip the backend benchmark (e.g. when flask isn't installed):
+      python benchmark.py --skip-backend
+
+    - Fail if any median exceeds a budget (useful in CI):
+      python benchmark.py --fail-above 500
+
+    - Only run the load -> match -> save benchmark on a 10k-row dataset:
+      python benchmark.py --suite data --rows 10000
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure MacLudus startup time and data path performance')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs per measurement')
+    parser.add_argument('--skip-backend', action='store_true', help='Skip the backend time-to-first-response benchmark')
+    parser.add_argument('--fail-above', type=float, help='Exit with an error if any median exceeds this many milliseconds')
+    parser.add_argument('--suite', choices=['startup', 'data', 'all'], default='all', help='Which benchmarks to run')
+    parser.add_argument('--rows', type=int, default=10000, help='Number of rows in the synthetic compatibility database')
+    parser.add_argument('--library-size', type=int, default=100, help='Number of games in the synthetic Steam library')
+
+    args = parser.parse_args()
+
+    results = []
+
+    if args.suite in ('startup', 'all'):
+        startup_results = [
+            ("python -c 'pass' (baseline)", time_command([sys.executable, '-c', 'pass'], args.repeat)),
+            ("import scrape", bench_import('scrape', args.repeat)),
+            ("import backend", bench_import('backend', args.repeat)),
+            ("import gui", bench_import('gui', args.repeat)),
+            ("scrape.py --help", bench_cli_help(args.repeat)),
+        ]
+
+        if not args.skip_backend:
+            try:
+                startup_results.append(("backend time to first response",
+                                        bench_backend_first_response(max(1, args.repeat // 2))))
+            except RuntimeError as e:
+                print(f"Backend benchmark failed: {e}")
+
+        print("Startup benchmarks:")
+        print("-" * 80)
+        for label, timings in startup_results:
+            print_result(label, timings)
+        results.extend(startup_results)
+
+    if args.suite in ('data', 'all'):
+        data_results = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dataset = os.path.join(temp_dir, 'benchmark_games.csv')
+            names = make_benchmark_dataset(dataset, args.rows)
+            library = make_benchmark_library(names, args.library_size)
+
+            modes = [("load/match/save (native csv)", False)]
+            try:
+                import pandas
+                modes.append(("load/match/save (pandas)", True))
+            except ImportError:
+                pass
+
+            for label, use_pandas in modes:
+                timings, peak = bench_load_match_save(dataset, library, max(1, args.repeat // 2), use_pandas)
+                data_results.append((label, timings, peak))
+
+            libraries = [make_benchmark_library(names, args.library_size, seed) for seed in range(1, 6)]
+            uncached, cached, cache_stats = bench_match_cache(dataset, libraries)
+            resident = bench_resident_memory(dataset, library)
+            data_results.append(("match 5 libraries (no match cache)", uncached, None))
+            data_results.append(("match 5 libraries (shared match cache)", cached, None))
+
+        print(f"\nData path benchmarks ({args.rows} rows, {args.library_size} library games):")
+        print("-" * 80)
+        for label, timings, peak in data_results:
+            print_result(label, timings)
+            if peak is not None:
+                print(f"{'':<40} peak memory {peak / (1024 * 1024):8.1f} MiB")
+        print(f"{'':<40} match cache hit rate {cache_stats['hit_rate']:.0%}")
+        for label, size in resident.items():
+            print(f"{'database + results as ' + label:<40} resident {size / (1024 * 1024):8.1f} MiB")
+        results.extend((label, timings) for label, timings, _ in data_results)
+
+    if args.fail_above is not None:
+        slow = [label for label, timings in results if statistics.median(timings) > args.fail_above]
+        if slow:
+            print(f"\nOver budget ({args.fail_above} ms): {', '.join(slow)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+import socket
+import datetime
+
+# Only the client side (daemon_request) is needed by the CLI, so this module
+# keeps its top-level imports light; the server imports scrape lazily.
+
+SOCKET_ENV_VAR = "MACLUDUS_SOCKET"
+
+
+def default_socket_path():
+    """
+    Return the Unix socket path the daemon listens on.
+    Can be overridden with the MACLUDUS_SOCKET environment variable.
+    """
+    if os.environ.get(SOCKET_ENV_VAR):
+        return os.environ[SOCKET_ENV_VAR]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "macludus.sock")
+    uid = os.getuid() if hasattr(os, 'getuid') else 'user'
+    return os.path.join("/tmp", f"macludus-{uid}.sock")
+
+
+def daemon_request(command, socket_path=None, timeout=None, **params):
+    """
+    Send a command to a running daemon and return its response as a dictionary.
+
+    Returns None if no daemon is listening (or Unix sockets aren't supported),
+    so callers can fall back to doing the work in-process.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    socket_path = socket_path or default_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    message = dict(params, command=command)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1)
+            sock.connect(socket_path)
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(message).encode('utf-8') + b"\n")
+
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if chunk.endswith(b"\n"):
+                    break
+        return json.loads(b"".join(chunks).decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+class DaemonState:
+    """What the daemon keeps warm between requests."""
+
+    def __init__(self, databases, match_cache):
+        # Loaded and indexed compatibility databases, keyed by CSV path
+        self.databases = databases
+        # Ranked match candidates shared across every check
+        self.match_cache = match_cache
+
+
+def handle_ping(state, params):
+    return {"ok": True, "pid": os.getpid()}
+
+
+def handle_status(state, params):
+    csv_filename = params["csv_filename"]
+    if not os.path.exists(csv_filename):
+        return {"exists": False, "last_updated": None}
+    compatibility_data, _ = state.databases.get(csv_filename)
+    last_update = datetime.datetime.fromtimestamp(os.path.getmtime(csv_filename))
+    return {
+        "exists": True,
+        "last_updated": last_update.strftime('%Y-%m-%d'),
+        "game_count": len(compatibility_data)
+    }
+
+
+def handle_update(state, params):
+    from scrape import get_game_info
+    from storage import write_csv_rows
+    from export import export_excel_in_background
+    from store import ensure_store
+    from history import history_filename_for, record_snapshot
+
+    csv_filename = params["csv_filename"]
+    games = get_game_info(params["wiki_url"])
+    if not games:
+        return {"error": "Failed to extract game information"}
+
+    write_csv_rows(csv_filename, games)
+    version = record_snapshot(history_filename_for(csv_filename), games)
+    ensure_store(csv_filename)
+    excel_filename = os.path.join(os.path.dirname(csv_filename), "macludus_compatible_games.xlsx")
+    excel = export_excel_in_background(csv_filename, excel_filename) is not None
+    state.databases.get(csv_filename)
+    return {"message": "Database updated successfully", "game_count": len(games), "excel": excel,
+            "version": version}
+
+
+def handle_resolve(state, params):
+    from scrape import extract_steam_id, get_steam_username
+
+    steam_id = extract_steam_id(params["steam_profile"])
+    steam_username = get_steam_username(steam_id) if steam_id else None
+    return {"steam_id": steam_id, "username": steam_username}
+
+
+def handle_check(state, params):
+    from scrape import iter_steam_games
+    from profiles import check_profile, profiles_filename_for
+    from storage import as_dicts
+
+    csv_filename = params["csv_filename"]
+    compatibility_data, index = state.databases.get(csv_filename)
+    steam_games = (game['name'] for game in iter_steam_games(params["steam_id"], params.get("api_key")))
+    matched_games, recheck = check_profile(
+        profiles_filename_for(csv_filename), params["steam_id"], steam_games, compatibility_data, index,
+        state.match_cache, full=params.get("full", False))
+    if not matched_games:
+        return {"error": "No games found in the Steam library"}
+
+    return {"matched_games": as_dicts(matched_games), "game_count": len(matched_games), "recheck": recheck}
+
+
+def handle_stats(state, params):
+    from ratelimit import get_rate_limiter
+
+    return {"match_cache": state.match_cache.stats(), "rate_limit": get_rate_limiter().stats()}
+
+
+COMMANDS = {
+    "ping": handle_ping,
+    "status": handle_status,
+    "update": handle_update,
+    "resolve": handle_resolve,
+    "check": handle_check,
+    "stats": handle_stats,
+}
+
+
+def serve(socket_path=None, preload=(), match_cache_filename=None):
+    """
+    Run the daemon in the foreground until interrupted or sent 'shutdown'.
+    Databases listed in preload are loaded and indexed before accepting requests.
+    If match_cache_filename is given, the match cache is loaded from it and
+    saved back on exit.
+    """
+    import signal
+    import threading
+    import socketserver
+    from scrape import CompatibilityCache, MatchCache, get_http_session
+
+    socket_path = socket_path or default_socket_path()
+
+    if daemon_request("ping", socket_path) is not None:
+        print(f"A daemon is already listening on {socket_path}")
+        sys.exit(1)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # Stale socket left by a daemon that didn't exit cleanly
+
+    state = DaemonState(CompatibilityCache(), MatchCache(filename=match_cache_filename))
+    get_http_session()
+    for csv_filename in preload:
+        if os.path.exists(csv_filename):
+            state.databases.get(os.path.abspath(csv_filename))
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                params = json.loads(self.rfile.readline().decode('utf-8'))
+                command = params.pop("command", None)
+                if command == "shutdown":
+                    response = {"message": "Shutting down"}
+                    threading.Thread(target=self.server.shutdown).start()
+                elif command in COMMANDS:
+                    response = COMMANDS[command](state, params)
+                else:
+                    response = {"error": f"Unknown command: {command}"}
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    server = Server(socket_path, Handler)
+    os.chmod(socket_path, 0o600)
+    print(f"MacLudus daemon listening on {socket_path}")
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state.match_cache.save(state.databases.versions())
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main():
+    """
+    Run or stop the MacLudus daemon.
+
+    The daemon keeps the compatibility database loaded and indexed and reuses
+    HTTP connections, so `scrape.py` runs that find it skip interpreter-heavy
+    work and answer quickly. When no daemon is running, scrape.py does the work
+    itself.
+
+    Usage examples:
+    - Start the daemon in the foreground:
+      python daemon.py
+
+    - Use a custom socket path:
+      python daemon.py --socket /tmp/macludus.sock
+
+    - Preload a database other than ./macludus_compatible_games.csv:
+      python daemon.py --database /path/to/macludus_compatible_games.csv
+
+    - Stop a running daemon:
+      python daemon.py --stop
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the MacLudus background daemon')
+    parser.add_argument('--socket', type=str, help=f'Unix socket path (default: {default_socket_path()})')
+    parser.add_argument('--database', type=str, default="macludus_compatible_games.csv",
+                        help='Compatibility database to load at startup')
+    parser.add_argument('--match-cache', type=str, default=os.environ.get("MACLUDUS_MATCH_CACHE"),
+                        help='File to persist the match cache in between runs (default: $MACLUDUS_MATCH_CACHE)')
+    parser.add_argument('--stop', action='store_true', help='Stop a running daemon')
+
+    args = parser.parse_args()
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("The daemon requires Unix domain sockets, which this platform doesn't support.")
+        sys.exit(1)
+
+    if args.stop:
+        response = daemon_request("shutdown", args.socket)
+        if response is None:
+            print("No daemon is running.")
+            sys.exit(1)
+        print(response.get("message"))
+        return
+
+    serve(args.socket, [args.database], args.match_cache)
+
+
+if __name__ == "__main__":
+    main()
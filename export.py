@@ -0,0 +1,400 @@
+import os
+import csv
+import json
+import hashlib
+import tempfile
+import threading
+import importlib.util
+from abc import ABC, abstractmethod
+
+from storage import COMPATIBILITY_FIELDS, FILE_MODE, STATUS_FIELDS, as_dicts, iter_csv_rows
+
+# Number of rows buffered before each write to the output file
+DEFAULT_CHUNK_SIZE = 1000
+
+# Serializes background Excel exports so two refreshes in quick succession
+# don't write the same workbook at the same time
+_excel_lock = threading.Lock()
+
+
+def excel_available():
+    """Check whether openpyxl is installed without importing it."""
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+def file_digest(filename):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def arrow_available():
+    """Check whether pyarrow is installed without importing it."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class RowWriter(ABC):
+    """
+    Base class for streaming result writers; subclasses implement _open,
+    _write_chunk and _close.
+
+    Rows are buffered and written chunk_size at a time, so memory use stays flat
+    however many rows (or profiles) are written. Output goes to a temporary file
+    that is moved into place by close(), so readers never see a partial file.
+    Use as a context manager; if the block raises, the partial file is discarded.
+    """
+
+    suffix = ''
+
+    def __init__(self, filename, fieldnames=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.filename = filename
+        self.fieldnames = fieldnames
+        self.chunk_size = chunk_size
+        self.count = 0
+        self._buffer = []
+        self._opened = False
+
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, self._temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=self.suffix)
+        os.close(fd)
+
+    def write(self, row):
+        """Add one row, writing out a chunk when the buffer is full."""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        """Add every row from an iterable."""
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        """Write out any buffered rows."""
+        if not self._buffer:
+            return
+        if not self._opened:
+            if self.fieldnames is None:
+                self.fieldnames = list(self._buffer[0].keys())
+            self._open()
+            self._opened = True
+        self._write_chunk(self._buffer)
+        self.count += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """Flush remaining rows and move the finished file into place."""
+        self.flush()
+        if not self._opened:
+            # No rows: still produce a file with just the header/schema
+            if self.fieldnames is None:
+                self.fieldnames = COMPATIBILITY_FIELDS
+            self._open()
+            self._opened = True
+        self._close()
+        os.chmod(self._temp_path, FILE_MODE)
+        os.replace(self._temp_path, self.filename)
+
+    def abort(self):
+        """Discard the partially written file."""
+        try:
+            if self._opened:
+                self._close()
+        finally:
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    @abstractmethod
+    def _open(self):
+        """Create the output in self._temp_path and write the header or schema."""
+
+    @abstractmethod
+    def _write_chunk(self, rows):
+        """Write a list of buffered rows."""
+
+    @abstractmethod
+    def _close(self):
+        """Finish writing and close the output."""
+
+
+class CsvRowWriter(RowWriter):
+    """Writes rows as CSV, one chunk at a time."""
+
+    suffix = '.csv'
+
+    def _open(self):
+        self._file = open(self._temp_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def _write_chunk(self, rows):
+        self._writer.writerows(rows)
+
+    def _close(self):
+        self._file.close()
+
+
+class JsonLinesRowWriter(RowWriter):
+    """Writes one JSON object per line."""
+
+    suffix = '.jsonl'
+
+    def _open(self):
+        self._file = open(self._temp_path, 'w', encoding='utf-8')
+
+    def _write_chunk(self, rows):
+        self._file.write(''.join(json.dumps(row) + '\n' for row in as_dicts(rows)))
+
+    def _close(self):
+        self._file.close()
+
+
+class ExcelRowWriter(RowWriter):
+    """
+    Writes rows to an Excel workbook using openpyxl's write-only mode, which
+    streams rows to disk instead of building the whole workbook in memory.
+    """
+
+    suffix = '.xlsx'
+
+    def __init__(self, filename, fieldnames=None, chunk_size=DEFAULT_CHUNK_SIZE, sheet_title='Games'):
+        super().__init__(filename, fieldnames, chunk_size)
+        self.sheet_title = sheet_title
+
+    def _open(self):
+        from openpyxl import Workbook
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(title=self.sheet_title)
+        self._sheet.append(self.fieldnames)
+
+    def _write_chunk(self, rows):
+        for row in rows:
+            self._sheet.append([row.get(field, '') for field in self.fieldnames])
+
+    def _close(self):
+        self._workbook.save(self._temp_path)
+
+
+class _StatusDictionary:
+    """
+    Grows a dictionary of distinct status strings in first-seen order.
+    Each chunk's dictionary extends the previous one, so Arrow IPC files can
+    store later chunks as dictionary deltas.
+    """
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _ArrowRowWriter(RowWriter):
+    """
+    Shared code for the columnar writers. Text columns are plain strings and
+    compatibility status columns are dictionary-encoded, since they hold a
+    handful of distinct values repeated on every row.
+    """
+
+    def _open(self):
+        import pyarrow as pa
+
+        self._status_dictionaries = {
+            field: _StatusDictionary() for field in self.fieldnames if field in STATUS_FIELDS
+        }
+        self._schema = pa.schema([
+            pa.field(field, pa.dictionary(pa.int32(), pa.string()) if field in STATUS_FIELDS else pa.string())
+            for field in self.fieldnames
+        ])
+
+    def _record_batch(self, rows):
+        import pyarrow as pa
+
+        columns = []
+        for field in self.fieldnames:
+            values = ['' if row.get(field) is None else str(row.get(field)) for row in rows]
+            dictionary = self._status_dictionaries.get(field)
+            if dictionary is None:
+                columns.append(pa.array(values, type=pa.string()))
+            else:
+                indices = pa.array([dictionary.encode(value) for value in values], type=pa.int32())
+                columns.append(pa.DictionaryArray.from_arrays(
+                    indices, pa.array(dictionary.values, type=pa.string())))
+        return pa.RecordBatch.from_arrays(columns, schema=self._schema)
+
+
+class ParquetRowWriter(_ArrowRowWriter):
+    """Writes rows to a Parquet file, one row group per chunk."""
+
+    suffix = '.parquet'
+
+    def _open(self):
+        import pyarrow.parquet as pq
+
+        super()._open()
+        self._writer = pq.ParquetWriter(self._temp_path, self._schema)
+
+    def _write_chunk(self, rows):
+        self._writer.write_batch(self._record_batch(rows))
+
+    def _close(self):
+        self._writer.close()
+
+
+class ArrowRowWriter(_ArrowRowWriter):
+    """Writes rows to an Arrow IPC (Feather v2) file, one record batch per chunk."""
+
+    suffix = '.arrow'
+
+    def _open(self):
+        import pyarrow as pa
+
+        super()._open()
+        self._sink = pa.OSFile(self._temp_path, 'wb')
+        self._writer = pa.ipc.new_file(self._sink, self._schema,
+                                       options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+    def _write_chunk(self, rows):
+        self._writer.write_batch(self._record_batch(rows))
+
+    def _close(self):
+        self._writer.close()
+        self._sink.close()
+
+
+ROW_WRITERS = {
+    'csv': CsvRowWriter,
+    'jsonl': JsonLinesRowWriter,
+    'xlsx': ExcelRowWriter,
+    'parquet': ParquetRowWriter,
+    'arrow': ArrowRowWriter,
+}
+
+# File extensions recognised by format_from_filename
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.xlsx': 'xlsx',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+}
+
+
+def format_from_filename(filename):
+    """Pick an export format from a file extension, defaulting to CSV."""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(filename)[1].lower(), 'csv')
+
+
+def open_row_writer(filename, format=None, fieldnames=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Open a streaming writer for result rows.
+
+    format is one of 'csv', 'jsonl', 'xlsx', 'parquet' or 'arrow'; if omitted it
+    is taken from the file extension. 'xlsx' needs openpyxl and 'parquet'/'arrow'
+    need pyarrow; a ValueError is raised if the required package is missing.
+
+    Example, streaming several profiles into one file:
+        with open_row_writer("report.parquet") as writer:
+            for matched_games in results_per_profile:
+                writer.write_rows(matched_games)
+    """
+    format = format or format_from_filename(filename)
+    if format not in ROW_WRITERS:
+        raise ValueError(f"Unsupported export format: {format}")
+    if format == 'xlsx' and not excel_available():
+        raise ValueError("Excel export requires openpyxl: pip install openpyxl")
+    if format in ('parquet', 'arrow') and not arrow_available():
+        raise ValueError(f"{format.title()} export requires pyarrow: pip install pyarrow")
+    return ROW_WRITERS[format](filename, fieldnames, chunk_size)
+
+
+def write_excel_rows(filename, rows, fieldnames=None, sheet_title='Games'):
+    """
+    Write an iterable of dictionaries to an Excel workbook, one row at a time.
+    Returns the number of rows written.
+    """
+    with ExcelRowWriter(filename, fieldnames, sheet_title=sheet_title) as writer:
+        writer.write_rows(rows)
+    return writer.count
+
+
+def export_csv_to_excel(csv_filename, excel_filename):
+    """
+    Convert a CSV file to an Excel workbook, skipping the work if the workbook
+    was already generated from identical CSV contents.
+
+    The digest of the source CSV is kept next to the workbook in
+    '<excel_filename>.sha256'. Returns 'written' or 'unchanged'.
+    """
+    digest_filename = excel_filename + '.sha256'
+    source_digest = file_digest(csv_filename)
+
+    if os.path.exists(excel_filename) and os.path.exists(digest_filename):
+        with open(digest_filename, encoding='utf-8') as f:
+            if f.read().strip() == source_digest:
+                return 'unchanged'
+
+    write_excel_rows(excel_filename, iter_csv_rows(csv_filename))
+    with open(digest_filename, 'w', encoding='utf-8') as f:
+        f.write(source_digest)
+    return 'written'
+
+
+def export_excel_in_background(csv_filename, excel_filename, on_done=None):
+    """
+    Export a committed CSV file to Excel on a background thread.
+
+    on_done, if given, is called from the background thread as
+    on_done(status, error) where status is 'written', 'unchanged' or 'failed'.
+
+    Returns the started thread, or None if openpyxl is not installed.
+    The thread is not a daemon, so a CLI run waits for the export before exiting.
+    """
+    if not excel_available():
+        return None
+
+    def run():
+        with _excel_lock:
+            try:
+                status, error = export_csv_to_excel(csv_filename, excel_filename), None
+            except Exception as e:
+                status, error = 'failed', e
+        if on_done:
+            on_done(status, error)
+
+    thread = threading.Thread(target=run, name='excel-export')
+    thread.start()
+    return thread
+
+
+def save_rows(filename, rows, format=None):
+    """
+    Save result rows to a file, streaming them through open_row_writer.
+    The format is taken from the file extension unless given explicitly.
+
+    Returns the number of rows written.
+    """
+    with open_row_writer(filename, format) as writer:
+        writer.write_rows(rows)
+    return writer.count
@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import threading
-import pandas as pd
 import os
 import sys
 import datetime
@@ -10,6 +9,10 @@ from scrape import (
     extract_username_from_url, should_update_database,
     get_game_info, match_games_with_compatibility
 )
+from storage import GameRecord, load_compatibility_data, write_csv_rows
+from export import export_excel_in_background, save_rows
+from history import history_filename_for, record_snapshot
+from summary import LABELS, summarize_games
 
 class MacLudusGUI:
     def __init__(self, root):
@@ -75,6 +78,13 @@ class MacLudusGUI:
         self.results_text.pack(fill=tk.BOTH, expand=True)
         self.results_text.config(state=tk.DISABLED)
 
+        # Summary section: how many games run best under each method
+        summary_frame = ttk.LabelFrame(main_frame, text="Summary", padding="10")
+        summary_frame.pack(fill=tk.X, pady=5)
+
+        self.summary_var = tk.StringVar(value="Check a profile to see a summary of its library.")
+        ttk.Label(summary_frame, textvariable=self.summary_var, justify=tk.LEFT, wraplength=800).pack(side=tk.LEFT, padx=5)
+
         # Data storage
         self.compatibility_data = None
         self.matched_games = None
@@ -106,25 +116,19 @@ class MacLudusGUI:
         try:
             games = get_game_info(self.wiki_url)
             if games:
-                # Convert to DataFrame
-                df = pd.DataFrame(games)
-
                 # Save to CSV
-                df.to_csv(self.csv_filename, index=False)
+                write_csv_rows(self.csv_filename, games)
+                record_snapshot(history_filename_for(self.csv_filename), games)
 
-                # Try to save to Excel if openpyxl is available
-                try:
-                    import openpyxl
-                    excel_filename = "macludus_compatible_games.xlsx"
-                    df.to_excel(excel_filename, index=False)
-                    self.root.after(0, lambda: self.status_var.set(
-                        f"Database updated with {len(games)} games. Saved to CSV and Excel."))
-                except ImportError:
-                    self.root.after(0, lambda: self.status_var.set(
-                        f"Database updated with {len(games)} games. Saved to CSV only."))
-
-                # Store the compatibility data
-                self.compatibility_data = games
+                self.root.after(0, lambda: self.status_var.set(
+                    f"Database updated with {len(games)} games. Saved to CSV."))
+
+                # Export to Excel in the background if openpyxl is available
+                excel_filename = "macludus_compatible_games.xlsx"
+                export_excel_in_background(self.csv_filename, excel_filename, self._excel_export_done)
+
+                # Store the compatibility data as compact records
+                self.compatibility_data = [GameRecord.from_row(game) for game in games]
             else:
                 self.root.after(0, lambda: self.status_var.set(
                     "Failed to extract game information."))
@@ -138,6 +142,14 @@ class MacLudusGUI:
         self.root.after(0, lambda: self.progress.stop())
         self.root.after(0, self.check_database_status)
 
+    def _excel_export_done(self, status, error):
+        """Callback from the background Excel export"""
+        if status == 'written':
+            self.root.after(0, lambda: self.status_var.set(
+                "Database also exported to macludus_compatible_games.xlsx."))
+        elif status == 'failed':
+            self.root.after(0, lambda: self.status_var.set(f"Error exporting database to Excel: {str(error)}"))
+
     def check_compatibility(self):
         """Check compatibility of games in the Steam profile"""
         steam_profile = self.url_entry.get().strip()
@@ -170,8 +182,7 @@ class MacLudusGUI:
             # Load compatibility data if not already loaded
             if not self.compatibility_data:
                 try:
-                    compatibility_df = pd.read_csv(self.csv_filename)
-                    self.compatibility_data = compatibility_df.to_dict('records')
+                    self.compatibility_data = load_compatibility_data(self.csv_filename)
                 except Exception as e:
                     self.root.after(0, lambda: messagebox.showerror(
                         "Error", f"Error loading compatibility data: {str(e)}"))
@@ -262,8 +273,17 @@ class MacLudusGUI:
 
         self.results_text.config(state=tk.DISABLED)
 
+        self.display_summary(summarize_games(matched_games))
+
+    def display_summary(self, summary):
+        """Show the best-method counts of a library summary in the summary panel"""
+        games = summary["games"]
+        parts = [f"{LABELS[method]}: {count} ({count / games:.0%})"
+                 for method, count in summary["best_method"].items() if count and games]
+        self.summary_var.set(f"{games} games. Best way to run: " + ", ".join(parts))
+
     def save_results(self):
-        """Save the compatibility results to a CSV file"""
+        """Save the compatibility results to a CSV, Excel, JSON Lines, Parquet or Arrow file"""
         if not self.matched_games:
             messagebox.showwarning("No Data", "No compatibility data to save.")
             return
@@ -271,7 +291,8 @@ class MacLudusGUI:
         # Ask for save location
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("JSON Lines files", "*.jsonl"),
+                       ("Parquet files", "*.parquet"), ("Arrow IPC files", "*.arrow"), ("All files", "*.*")],
             title="Save Compatibility Results"
         )
 
@@ -279,9 +300,8 @@ class MacLudusGUI:
             return  # User cancelled
 
         try:
-            # Save to CSV
-            output_df = pd.DataFrame(self.matched_games)
-            output_df.to_csv(file_path, index=False)
+            # Save in the format matching the chosen file extension
+            save_rows(file_path, self.matched_games)
             messagebox.showinfo("Success", f"Results saved to {file_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Error saving results: {str(e)}")
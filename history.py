@@ -0,0 +1,217 @@
+import os
+import json
+import sqlite3
+import hashlib
+import datetime
+
+from storage import COMPATIBILITY_FIELDS
+
+# Each distinct row is stored once; a version is the set of rows alive at it.
+# Row membership is kept as spans [start_version, end_version), so a refresh
+# only writes the rows that changed and a diff only reads the rows that changed.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    game_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS spans (
+    row_id INTEGER NOT NULL REFERENCES rows (id),
+    start_version INTEGER NOT NULL,
+    end_version INTEGER
+);
+CREATE INDEX IF NOT EXISTS spans_start ON spans (start_version);
+CREATE INDEX IF NOT EXISTS spans_end ON spans (end_version);
+CREATE INDEX IF NOT EXISTS versions_created_at ON versions (created_at);
+"""
+
+
+def history_filename_for(csv_filename):
+    """Return the history database path kept next to a compatibility CSV file."""
+    return os.path.join(os.path.dirname(os.path.abspath(csv_filename)), "macludus_history.sqlite")
+
+
+def _connect(history_filename):
+    connection = sqlite3.connect(history_filename, timeout=30)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _row_data(game):
+    """Serialize a game row in a stable form; identical rows get identical digests."""
+    data = json.dumps(['' if game.get(field) is None else str(game.get(field))
+                       for field in COMPATIBILITY_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest(), data
+
+
+def record_snapshot(history_filename, games, created_at=None):
+    """
+    Store a refresh of the compatibility database as a new version.
+
+    Rows that are unchanged since the previous version are shared with it, so
+    a refresh costs space only for the rows that changed. Returns the new
+    version number.
+    """
+    created_at = created_at or datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+    rows = [_row_data(game) for game in games]
+    new_rows = dict(rows)
+
+    connection = _connect(history_filename)
+    try:
+        with connection:
+            current = dict(connection.execute(
+                "SELECT rows.digest, spans.rowid FROM spans JOIN rows ON rows.id = spans.row_id "
+                "WHERE spans.end_version IS NULL"))
+
+            version = connection.execute(
+                "INSERT INTO versions (created_at, game_count) VALUES (?, ?)",
+                (created_at, len(rows))).lastrowid
+
+            # Close the spans of rows that disappeared in this version
+            connection.executemany(
+                "UPDATE spans SET end_version = ? WHERE rowid = ?",
+                [(version, span_id) for digest, span_id in current.items() if digest not in new_rows])
+
+            # Open spans for rows that appeared, reusing stored rows seen in older versions
+            for digest, data in new_rows.items():
+                if digest in current:
+                    continue
+                connection.execute("INSERT OR IGNORE INTO rows (digest, data) VALUES (?, ?)", (digest, data))
+                row_id = connection.execute("SELECT id FROM rows WHERE digest = ?", (digest,)).fetchone()[0]
+                connection.execute("INSERT INTO spans (row_id, start_version) VALUES (?, ?)", (row_id, version))
+        return version
+    finally:
+        connection.close()
+
+
+def list_versions(history_filename):
+    """Return every stored version with its timestamp and game count, oldest first."""
+    if not os.path.exists(history_filename):
+        return []
+    connection = _connect(history_filename)
+    try:
+        return [
+            {"version": version, "created_at": created_at, "game_count": game_count}
+            for version, created_at, game_count in connection.execute(
+                "SELECT id, created_at, game_count FROM versions ORDER BY id")
+        ]
+    finally:
+        connection.close()
+
+
+def load_version(history_filename, version):
+    """Return the rows of one version as a list of dictionaries."""
+    connection = _connect(history_filename)
+    try:
+        return [
+            dict(zip(COMPATIBILITY_FIELDS, json.loads(data)))
+            for (data,) in connection.execute(
+                "SELECT rows.data FROM spans JOIN rows ON rows.id = spans.row_id "
+                "WHERE spans.start_version <= ? AND (spans.end_version IS NULL OR spans.end_version > ?) "
+                "ORDER BY rows.id", (version, version))
+        ]
+    finally:
+        connection.close()
+
+
+def _pair_rows(old_rows, new_rows):
+    """
+    Pair the rows of one game name in two versions: rows with the same URL
+    first, then the remaining ones in order (e.g. a row whose URL changed).
+    Returns the (old, new) pairs; rows left over were removed or added.
+    """
+    new_rows = list(new_rows)
+    pairs, unpaired_old = [], []
+    for old in old_rows:
+        position = next((i for i, new in enumerate(new_rows) if new['url'] == old['url']), None)
+        if position is None:
+            unpaired_old.append(old)
+        else:
+            pairs.append((old, new_rows.pop(position)))
+
+    count = min(len(unpaired_old), len(new_rows))
+    return pairs + list(zip(unpaired_old[:count], new_rows[:count]))
+
+
+def diff_versions(history_filename, old_version, new_version):
+    """
+    Compare two versions, reading only the rows that changed between them.
+
+    Rows are paired by game name, and by URL among rows sharing a name: a row
+    present in both versions with different values is reported under
+    "changed" with the old and new value of each differing column. Returns a
+    dictionary with "added", "removed" and "changed" lists.
+    """
+    if old_version > new_version:
+        diff = diff_versions(history_filename, new_version, old_version)
+        diff["added"], diff["removed"] = diff["removed"], diff["added"]
+        for change in diff["changed"]:
+            change["changes"] = {field: [new, old] for field, (old, new) in change["changes"].items()}
+        diff["from_version"], diff["to_version"] = old_version, new_version
+        return diff
+
+    connection = _connect(history_filename)
+    try:
+        def rows(sql, args):
+            return [dict(zip(COMPATIBILITY_FIELDS, json.loads(data)))
+                    for (data,) in connection.execute(sql, args)]
+
+        # Alive at old_version, gone by new_version
+        removed = rows(
+            "SELECT rows.data FROM spans JOIN rows ON rows.id = spans.row_id "
+            "WHERE spans.start_version <= ? AND spans.end_version > ? AND spans.end_version <= ?",
+            (old_version, old_version, new_version))
+        # Appeared after old_version and still alive at new_version
+        added = rows(
+            "SELECT rows.data FROM spans JOIN rows ON rows.id = spans.row_id "
+            "WHERE spans.start_version > ? AND spans.start_version <= ? "
+            "AND (spans.end_version IS NULL OR spans.end_version > ?)",
+            (old_version, new_version, new_version))
+    finally:
+        connection.close()
+
+    # The wiki can list several rows under one name, so rows are grouped per name
+    removed_by_name, added_by_name = {}, {}
+    for game in removed:
+        removed_by_name.setdefault(game['name'], []).append(game)
+    for game in added:
+        added_by_name.setdefault(game['name'], []).append(game)
+
+    changed = []
+    paired = set()
+    for name in sorted(removed_by_name.keys() & added_by_name.keys()):
+        pairs = _pair_rows(removed_by_name[name], added_by_name[name])
+        for old, new in sorted(pairs, key=lambda pair: pair[1]['url']):
+            paired.update((id(old), id(new)))
+            changes = {field: [old[field], new[field]]
+                       for field in COMPATIBILITY_FIELDS if old[field] != new[field]}
+            # A row that changed and then changed back shows up on both sides unchanged
+            if changes:
+                changed.append({"name": name, "url": new['url'], "changes": changes})
+
+    return {
+        "from_version": old_version,
+        "to_version": new_version,
+        "added": [game for game in added if id(game) not in paired],
+        "removed": [game for game in removed if id(game) not in paired],
+        "changed": changed,
+    }
+
+
+def changes_since(history_filename, since):
+    """
+    Diff the last version recorded before a date (YYYY-MM-DD) against the
+    latest version. Returns None if there is no history.
+    """
+    versions = list_versions(history_filename)
+    if not versions:
+        return None
+
+    before = [v["version"] for v in versions if v["created_at"] < since]
+    old_version = before[-1] if before else versions[0]["version"]
+    return diff_versions(history_filename, old_version, versions[-1]["version"])
@@ -0,0 +1,376 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from html import escape
+
+from benchmark import BENCHMARK_STATUSES, make_benchmark_games, make_benchmark_library
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Steam IDs handed out to the simulated profiles
+BASE_STEAM_ID = 76561190000000000
+
+
+class StubUpstream:
+    """
+    Local stand-in for steamcommunity.com and the Apple Gaming Wiki, so the
+    backend can be load tested offline.
+
+    Serves profile pages, games list XML and rgGames pages for any Steam ID,
+    with a library size picked from profile_sizes by the ID, and a wiki master
+    list whose statuses change slightly on every fetch (so each database
+    update is a new version). Every response is delayed by latency plus up to
+    jitter seconds, and error_rate of them fail with a 503.
+    """
+
+    def __init__(self, rows=10000, profile_sizes=(50, 500, 3000), latency=0.0, jitter=0.0,
+                 error_rate=0.0, seed=0):
+        self.games = make_benchmark_games(rows, seed)
+        self.names = [game['name'] for game in self.games]
+        self.profile_sizes = profile_sizes
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.libraries = {}
+        self.revision = 0
+        self.requests = 0
+        self.injected_errors = 0
+        self.server = None
+
+    def library(self, steam_id):
+        """Return the (stable) library of a simulated profile."""
+        with self.lock:
+            library = self.libraries.get(steam_id)
+            if library is None:
+                size = self.profile_sizes[steam_id % len(self.profile_sizes)]
+                library = self.libraries[steam_id] = make_benchmark_library(self.names, size, steam_id)
+            return library
+
+    def profile_page(self, steam_id):
+        return f'<html><body><span class="actual_persona_name">Load Test {steam_id}</span></body></html>'
+
+    def games_xml(self, steam_id):
+        games = ''.join(
+            f"<game><appID>{appid}</appID><name><![CDATA[{name}]]></name>"
+            f"<hoursOnRecord>{appid % 500 / 10}</hoursOnRecord></game>"
+            for appid, name in enumerate(self.library(steam_id), start=1))
+        return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<gamesList><steamID64>{steam_id}</steamID64><games>{games}</games></gamesList>')
+
+    def games_page(self, steam_id):
+        games = [{"appid": appid, "name": name} for appid, name in enumerate(self.library(steam_id), start=1)]
+        return f"<html><script>var rgGames = {json.dumps(games)};</script></html>"
+
+    def wiki_page(self):
+        """Render the master list; about 1% of statuses change on every fetch."""
+        with self.lock:
+            self.revision += 1
+            rng = random.Random(self.revision)
+            for game in rng.sample(self.games, max(1, len(self.games) // 100)):
+                game['native'] = rng.choice(BENCHMARK_STATUSES)
+            rows = [
+                f'<tr><th><a href="/wiki/Game_{i}">{escape(game["name"])}</a></th>'
+                + ''.join(f"<td>{escape(game[field])}</td>"
+                          for field in ('native', 'rosetta_2', 'crossover', 'wine', 'parallels', 'linux_arm'))
+                + '</tr>'
+                for i, game in enumerate(self.games)
+            ]
+        return ('<html><body><table id="table-listofgames"><tr><th>Game</th><th>Native</th><th>Rosetta 2</th>'
+                '<th>CrossOver</th><th>Wine</th><th>Parallels</th><th>Linux ARM</th></tr>'
+                + ''.join(rows) + '</table></body></html>')
+
+    def respond(self, path):
+        """Return (status, content type, body) for a request path."""
+        with self.lock:
+            self.requests += 1
+            delay = self.latency + self.rng.random() * self.jitter
+            fail = self.rng.random() < self.error_rate
+            if fail:
+                self.injected_errors += 1
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return 503, 'text/plain', 'Injected error'
+
+        parts = path.split('?', 1)[0].strip('/').split('/')
+        if parts[0] == 'wiki':
+            return 200, 'text/html', self.wiki_page()
+        if parts[0] == 'profiles' and len(parts) >= 2 and parts[1].isdigit():
+            steam_id = int(parts[1])
+            if len(parts) == 2:
+                return 200, 'text/html', self.profile_page(steam_id)
+            if parts[2] == 'games':
+                if 'xml=1' in path:
+                    return 200, 'text/xml', self.games_xml(steam_id)
+                return 200, 'text/html', self.games_page(steam_id)
+        return 404, 'text/plain', 'Not found'
+
+    def start(self):
+        """Start serving on a free local port; returns the base URL."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, content_type, body = stub.respond(self.path)
+                body = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='stub-upstream', daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def start_backend(upstream_url, data_dir, timeout=60):
+    """
+    Start backend.py on a free port with its upstreams pointed at the stub and
+    its data files in data_dir. Returns (process, base URL).
+    """
+    from readiness import READY_MARKER
+
+    env = dict(os.environ,
+               MACLUDUS_STEAM_COMMUNITY_URL=upstream_url,
+               MACLUDUS_STEAM_API_URL=upstream_url,
+               MACLUDUS_WIKI_URL=f"{upstream_url}/wiki/M1_compatible_games_master_list",
+               MACLUDUS_DATA_DIR=data_dir,
+               MACLUDUS_RATE_LIMIT_DB=os.path.join(data_dir, 'ratelimit.sqlite'))
+    env.pop("MACLUDUS_MATCH_CACHE", None)
+
+    process = subprocess.Popen([sys.executable, os.path.join(script_dir, 'backend.py'), '--port', '0'],
+                               cwd=data_dir, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    port = None
+    deadline = time.time() + timeout
+    for line in process.stdout:
+        if line.startswith(READY_MARKER):
+            port = json.loads(line[len(READY_MARKER):])["port"]
+            break
+        if time.time() > deadline:
+            break
+    if port is None:
+        process.kill()
+        raise RuntimeError(f"Backend exited with code {process.wait()} before becoming ready")
+
+    # Keep draining the backend's log output so it never blocks on a full pipe
+    threading.Thread(target=lambda: [None for _ in process.stdout], daemon=True).start()
+    return process, f"http://127.0.0.1:{port}"
+
+
+def post_json(url, payload, timeout=300):
+    """POST a JSON body; returns (status code or 'error', duration in seconds)."""
+    data = json.dumps(payload).encode('utf-8')
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 'error'
+    return status, time.perf_counter() - start
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples, elapsed):
+    """Aggregate (status, seconds) samples into throughput, latency percentiles and error counts."""
+    latencies = sorted(seconds * 1000 for _, seconds in samples)
+    errors = {}
+    for status, _ in samples:
+        if status == 'error' or not 200 <= status < 300:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+    error_count = sum(errors.values())
+    return {
+        "requests": len(samples),
+        "errors": error_count,
+        "error_rate": round(error_count / len(samples), 4) if samples else 0.0,
+        "errors_by_status": errors,
+        "throughput": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+    }
+
+
+def run_level(backend_url, concurrency, total_requests, profiles, full_recheck=False,
+              update_interval=0, seed=0):
+    """
+    Send total_requests /check-compatibility requests from concurrency workers,
+    each for a random one of profiles simulated profiles. If update_interval is
+    set, /update-database is also called every update_interval seconds while
+    the checks run. Returns a summary per endpoint.
+    """
+    rng = random.Random(seed)
+    steam_ids = [BASE_STEAM_ID + rng.randrange(profiles) for _ in range(total_requests)]
+    lock = threading.Lock()
+    check_samples = []
+    update_samples = []
+    done = threading.Event()
+
+    def worker():
+        while True:
+            with lock:
+                if not steam_ids:
+                    return
+                steam_id = steam_ids.pop()
+            sample = post_json(f"{backend_url}/check-compatibility", {
+                "steam_profile": f"https://steamcommunity.com/profiles/{steam_id}",
+                "full_recheck": full_recheck,
+            })
+            with lock:
+                check_samples.append(sample)
+
+    def updater():
+        while not done.wait(update_interval):
+            update_samples.append(post_json(f"{backend_url}/update-database", {}))
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+    update_thread = threading.Thread(target=updater) if update_interval else None
+    if update_thread:
+        update_thread.start()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    if update_thread:
+        update_thread.join()
+
+    results = {"check-compatibility": summarize(check_samples, elapsed)}
+    if update_samples:
+        results["update-database"] = summarize(update_samples, elapsed)
+    return results
+
+
+def print_level(concurrency, results):
+    for endpoint, summary in results.items():
+        errors = ', '.join(f"{status}: {count}" for status, count in sorted(summary["errors_by_status"].items()))
+        print(f"{concurrency:>5} {endpoint:<20} {summary['requests']:>6} {summary['throughput']:>8.1f}/s "
+              f"{summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f} "
+              f"{summary['error_rate']:>7.1%}" + (f"  ({errors})" if errors else ''))
+
+
+def main():
+    """
+    Load test backend.py offline, against local stub Steam and wiki servers.
+
+    The backend is started on a free port with its data files in a temporary
+    directory, the database is built from the stub wiki, and then
+    /check-compatibility is driven at each concurrency level in turn.
+
+    Usage examples:
+    - Find where latency collapses:
+      python loadtest.py --concurrency 1,4,16,64 --requests 200
+
+    - Large libraries on a slow, flaky upstream:
+      python loadtest.py --profile-sizes 2000,5000 --latency 200 --jitter 300 --error-rate 0.02
+
+    - Refresh the database every 5 seconds while checks run:
+      python loadtest.py --update-interval 5
+
+    - Always rematch whole libraries instead of reusing per-profile results:
+      python loadtest.py --full-recheck
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Load test the MacLudus backend against local upstream stubs')
+    parser.add_argument('--concurrency', type=str, default='1,4,16',
+                        help='Comma-separated numbers of concurrent clients to test in turn (default: 1,4,16)')
+    parser.add_argument('--requests', type=int, default=100, help='Checks sent at each concurrency level')
+    parser.add_argument('--profiles', type=int, default=50, help='Number of distinct simulated profiles')
+    parser.add_argument('--profile-sizes', type=str, default='50,500,3000',
+                        help='Comma-separated library sizes the profiles are spread over')
+    parser.add_argument('--rows', type=int, default=10000, help='Number of games on the stub wiki')
+    parser.add_argument('--latency', type=float, default=0, help='Added upstream latency per response, in ms')
+    parser.add_argument('--jitter', type=float, default=0, help='Random extra upstream latency of up to this many ms')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of upstream responses that fail with 503')
+    parser.add_argument('--update-interval', type=float, default=0,
+                        help='Update the database every this many seconds while checks run (default: off)')
+    parser.add_argument('--full-recheck', action='store_true', help='Ask for a full rematch on every check')
+    parser.add_argument('--json', type=str, metavar='FILE', help='Also write the results to a JSON file')
+
+    args = parser.parse_args()
+
+    try:
+        levels = [int(level) for level in args.concurrency.split(',')]
+        profile_sizes = [int(size) for size in args.profile_sizes.split(',')]
+    except ValueError:
+        parser.error("--concurrency and --profile-sizes take comma-separated integers")
+    if not 0 <= args.error_rate <= 1:
+        parser.error("--error-rate must be between 0 and 1")
+
+    stub = StubUpstream(args.rows, profile_sizes, args.latency / 1000, args.jitter / 1000, args.error_rate)
+    upstream_url = stub.start()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        process, backend_url = start_backend(upstream_url, data_dir)
+        try:
+            # Build the database without injected errors so every level starts from the same state
+            error_rate, stub.error_rate = stub.error_rate, 0
+            status, seconds = post_json(f"{backend_url}/update-database", {})
+            stub.error_rate = error_rate
+            if status != 200:
+                print(f"Could not build the database from the stub wiki (status {status}).")
+                sys.exit(1)
+            print(f"Database built from the stub wiki ({args.rows} games) in {seconds * 1000:.0f} ms")
+            print(f"Upstream latency {args.latency:.0f}+{args.jitter:.0f} ms, error rate {args.error_rate:.1%}, "
+                  f"library sizes {args.profile_sizes}, {args.profiles} profiles\n")
+
+            print(f"{'Conc.':>5} {'Endpoint':<20} {'Reqs':>6} {'Throughput':>10} "
+                  f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Errors':>7}")
+            print("-" * 80)
+            report = []
+            for level in levels:
+                results = run_level(backend_url, level, args.requests, args.profiles,
+                                    args.full_recheck, args.update_interval, seed=level)
+                print_level(level, results)
+                report.append({"concurrency": level, "results": results})
+        finally:
+            process.terminate()
+            process.wait()
+            stub.stop()
+
+    print(f"\nStub upstream served {stub.requests} requests ({stub.injected_errors} injected errors)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"options": vars(args), "levels": report}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,61 @@ const { spawn } = require('child_process');
 let mainWindow;
 let backendProcess;
 
+// Resolves with { port, startup_ms, launch_ms } once the backend reports it is ready
+let backendReady;
+
+// Line prefix printed by backend.py once it is accepting requests (READY_MARKER in readiness.py)
+const READY_MARKER = 'MACLUDUS_BACKEND_READY';
+
 // Start the Flask backend server
 function startBackend() {
     // Check if Python is available
     const pythonCommand = process.env.PYTHON || (process.platform === 'win32' ? 'python' : 'python3')
 
+    // Let the backend pick a free port unless one is configured; it reports the port back
+    const port = process.env.MACLUDUS_PORT || '0';
+    const launchTime = Date.now();
+
     // Start the backend process
     //TODO: On Unix, a process tree kill utility to ensure all children are killed.
-    backendProcess = spawn(pythonCommand, [path.join(__dirname, 'backend.py')]);
+    backendProcess = spawn(pythonCommand, [path.join(__dirname, 'backend.py'), '--port', port]);
+
+    backendReady = new Promise((resolve, reject) => {
+        let stdoutBuffer = '';
+
+        backendProcess.stdout.on('data', (data) => {
+            console.log(`Backend stdout: ${data}`);
+
+            // Look for the readiness line; output may arrive split across chunks
+            stdoutBuffer += data.toString();
+            const lines = stdoutBuffer.split('\n');
+            stdoutBuffer = lines.pop();
+            for (const line of lines) {
+                if (line.startsWith(READY_MARKER)) {
+                    const info = JSON.parse(line.slice(READY_MARKER.length));
+                    info.launch_ms = Date.now() - launchTime;
+                    console.log(`Backend ready on port ${info.port} after ${info.launch_ms} ms`);
+                    resolve(info);
+                }
+            }
+        });
 
-    backendProcess.stdout.on('data', (data) => {
-        console.log(`Backend stdout: ${data}`);
+        backendProcess.on('close', (code) => {
+            console.log(`Backend process exited with code ${code}`);
+            reject(new Error(`Backend exited with code ${code} before becoming ready`));
+        });
+
+        backendProcess.on('error', (error) => {
+            reject(error);
+        });
     });
 
+    // Avoid an unhandled rejection warning if nobody is waiting yet
+    backendReady.catch(() => {});
+
     backendProcess.stderr.on('data', (data) => {
         console.error(`Backend stderr: ${data}`);
     });
-
-    backendProcess.on('close', (code) => {
-        console.log(`Backend process exited with code ${code}`);
-    });
 }
 
 // Create the main window
@@ -47,6 +82,11 @@ function createWindow() {
     }
 }
 
+// Let the renderer wait for the backend and learn its port
+ipcMain.handle('backend-info', async () => {
+    return await backendReady;
+});
+
 // Handle the save dialog IPC call
 ipcMain.handle('show-save-dialog', async (event, options) => {
     const { canceled, filePath } = await dialog.showSaveDialog(mainWindow, options);
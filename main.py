@@ -1,21 +1,4 @@
-import subprocess
-import threading
 import sys
-def run_cli_in_background(args):
-    """Run the CLI version in the background."""
-    try:
-        process = subprocess.Popen(
-            [sys.executable, 'main.py', '--cli'] + args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        stdout, stderr = process.communicate()
-        if stdout:
-            print("CLI Output:", stdout.decode())
-        if stderr:
-            print("CLI Error:", stderr.decode())
-    except Exception as e:
-        print(f"Error running CLI in background: {e}")
 
 if __name__ == "__main__":
     # Check if any arguments were provided
@@ -25,17 +8,17 @@ if __name__ == "__main__":
             import tkinter as tk
             from gui import MacLudusGUI
 
-            # Start CLI in a separate thread
-            cli_thread = threading.Thread(target=run_cli_in_background, args=(sys.argv[2:],))
-            cli_thread.start()
-
             root = tk.Tk()
             app = MacLudusGUI(root)
             root.mainloop()
         else:
-            # Handle other arguments (e.g., CLI)
-            print("CLI mode not implemented in main.py. Please use scrape.py for CLI functionality.")
-            sys.exit(1)
+            # Run the command-line interface in this process (it uses a running
+            # daemon from daemon.py when one is available). `--cli` is optional.
+            from scrape import main as cli_main
+
+            if sys.argv[1] == "--cli":
+                sys.argv = [sys.argv[0]] + sys.argv[2:]
+            cli_main()
     else:
         # Default to GUI
         import tkinter as tk
@@ -3,12 +3,45 @@ const { contextBridge, ipcRenderer } = require('electron');
 // Store the username from the last successful check
 let lastUsername = null;
 
+// Resolves once the backend has reported that it is listening, with its port.
+// Requests made before then wait on this instead of failing.
+const backendReady = ipcRenderer.invoke('backend-info');
+
+// Last tagged response per POST request (URL and body), oldest first
+const postCache = new Map();
+const POST_CACHE_SIZE = 8;
+
 contextBridge.exposeInMainWorld('api', {
     fetch: async (url, options) => {
         console.log('Sending request:', url, options);
         try {
+            // Paths such as '/database-status' are resolved against the backend's port
+            const info = await backendReady;
+            if (url.startsWith('/')) {
+                url = `http://127.0.0.1:${info.port}${url}`;
+            }
+
+            // POST results (such as /check-compatibility) aren't kept by the
+            // HTTP cache, so their ETags are remembered here and sent back;
+            // the backend answers 304 when the results haven't changed.
+            // GET responses are revalidated by the HTTP cache on its own.
+            const method = ((options && options.method) || 'GET').toUpperCase();
+            const cacheKey = method === 'POST' ? `${url}\n${(options && options.body) || ''}` : null;
+            const cached = cacheKey ? postCache.get(cacheKey) : undefined;
+            if (cached) {
+                options = { ...options, headers: { ...(options.headers || {}), 'If-None-Match': cached.etag } };
+            }
+
             const response = await fetch(url, options);
 
+            if (response.status === 304 && cached) {
+                console.log('Response not modified, using cached data');
+                if (cached.data && cached.data.username) {
+                    lastUsername = cached.data.username;
+                }
+                return cached.data;
+            }
+
             // Check if response is ok and has content
             if (!response.ok) {
                 throw new Error(`HTTP error! Status: ${response.status}`);
@@ -21,36 +54,41 @@ contextBridge.exposeInMainWorld('api', {
                 return {};
             }
 
-            // Check if response has content length
-            const contentLength = response.headers.get('content-length');
-            if (contentLength === '0') {
+            // Read the body once; the text is kept for debugging if it isn't valid JSON
+            const textContent = await response.text();
+            if (!textContent) {
                 console.warn('Response has empty body');
                 return {}; // Return empty object for empty responses
             }
 
-            // Clone the response before parsing to avoid "body already read" errors
-            const clonedResponse = response.clone();
-
+            let data;
             try {
-                const data = await response.json();
-                console.log('Received response:', data);
-
-                // Store username if it's in the response
-                if (data && data.username) {
-                    lastUsername = data.username;
-                }
-
-                return data;
+                data = JSON.parse(textContent);
             } catch (jsonError) {
                 console.error('Error parsing JSON:', jsonError);
-
-                // Try to get the text content for debugging
-                const textContent = await clonedResponse.text();
                 console.error('Response text content:', textContent);
 
                 // Return empty object for invalid JSON
                 return {};
             }
+            console.log('Received response:', data);
+
+            // Store username if it's in the response
+            if (data && data.username) {
+                lastUsername = data.username;
+            }
+
+            const etag = response.headers.get('etag');
+            if (cacheKey && etag) {
+                postCache.delete(cacheKey);
+                postCache.set(cacheKey, { etag, data });
+                // Keep only the most recent results
+                while (postCache.size > POST_CACHE_SIZE) {
+                    postCache.delete(postCache.keys().next().value);
+                }
+            }
+
+            return data;
         } catch (error) {
             console.error('Error during request:', error);
             throw error;
@@ -67,6 +105,10 @@ contextBridge.exposeInMainWorld('api', {
         }
     },
 
+    getBackendInfo: async () => {
+        return await backendReady;
+    },
+
     getUsername: () => {
         return { username: lastUsername };
     }
@@ -0,0 +1,281 @@
+import os
+import sqlite3
+import hashlib
+import datetime
+
+from scrape import assign_matches, match_result
+
+# Per-profile match results, so a re-check only matches what changed in the
+# library. Matches are stored as compatibility entry indices, which are only
+# meaningful for the database version they were made against; a new database
+# version therefore always triggers a full rematch.
+#
+# Each match also records the wiki game name and URL it was matched to. They
+# identify rows across database versions (history diffs pair rows by name, then
+# by URL among rows sharing a name), so the index on wiki_name is a reverse
+# index from wiki rows to the profiles owning them, kept up to date as
+# profiles are checked.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    steam_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    db_version TEXT NOT NULL,
+    game_count INTEGER NOT NULL,
+    checked_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profile_games (
+    steam_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    steam_name TEXT NOT NULL,
+    entry INTEGER,
+    tier INTEGER,
+    wiki_name TEXT,
+    wiki_url TEXT,
+    PRIMARY KEY (steam_id, position)
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS profile_games_wiki_name ON profile_games (wiki_name);
+"""
+
+# Names looked up per query; SQLite limits the number of parameters in a statement
+LOOKUP_BATCH_SIZE = 500
+
+
+def profiles_filename_for(csv_filename):
+    """Return the profile results database path kept next to a compatibility CSV file."""
+    return os.path.join(os.path.dirname(os.path.abspath(csv_filename)), "macludus_profiles.sqlite")
+
+
+def _connect(profiles_filename):
+    connection = sqlite3.connect(profiles_filename, timeout=30)
+    connection.executescript(SCHEMA)
+    columns = {column[1] for column in connection.execute("PRAGMA table_info(profile_games)")}
+    if not {'wiki_name', 'wiki_url'} <= columns:
+        # Stored before matches recorded their wiki names and URLs; drop them so
+        # every profile is rematched (and indexed) on its next check
+        connection.executescript("DROP TABLE profile_games; DELETE FROM profiles;")
+        connection.executescript(SCHEMA)
+    connection.executescript(INDEXES)
+    return connection
+
+
+def library_fingerprint(steam_games):
+    """Fingerprint a Steam library; the order games are listed in doesn't matter."""
+    digest = hashlib.sha1()
+    for steam_game in sorted(steam_game for steam_game in steam_games if steam_game.strip()):
+        digest.update(steam_game.encode('utf-8') + b"\0")
+    return digest.hexdigest()
+
+
+def load_profile(profiles_filename, steam_id):
+    """
+    Return the stored results of a profile as a dictionary with its fingerprint,
+    db_version, checked_at and assignments (as returned by assign_matches),
+    or None if the profile was never checked.
+    """
+    if not os.path.exists(profiles_filename):
+        return None
+    connection = _connect(profiles_filename)
+    try:
+        profile = connection.execute(
+            "SELECT fingerprint, db_version, checked_at FROM profiles WHERE steam_id = ?", (steam_id,)).fetchone()
+        if profile is None:
+            return None
+        assignments = [
+            (steam_name, None if entry is None else (entry, tier))
+            for steam_name, entry, tier in connection.execute(
+                "SELECT steam_name, entry, tier FROM profile_games WHERE steam_id = ? ORDER BY position",
+                (steam_id,))
+        ]
+    finally:
+        connection.close()
+
+    fingerprint, db_version, checked_at = profile
+    return {"fingerprint": fingerprint, "db_version": db_version, "checked_at": checked_at,
+            "assignments": assignments}
+
+
+def save_profile(profiles_filename, steam_id, fingerprint, db_version, assignments, compatibility_data,
+                 checked_at=None):
+    """
+    Replace the stored results of a profile. compatibility_data is the database
+    the assignments index into, used to record the wiki name and URL of each match.
+    """
+    checked_at = checked_at or datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+    connection = _connect(profiles_filename)
+    try:
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO profiles (steam_id, fingerprint, db_version, game_count, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)", (steam_id, fingerprint, db_version, len(assignments), checked_at))
+            connection.execute("DELETE FROM profile_games WHERE steam_id = ?", (steam_id,))
+            connection.executemany(
+                "INSERT INTO profile_games (steam_id, position, steam_name, entry, tier, wiki_name, wiki_url) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(steam_id, position, steam_game, *(match or (None, None)),
+                  *((compatibility_data[match[0]]['name'], compatibility_data[match[0]]['url'])
+                    if match else (None, None)))
+                 for position, (steam_game, match) in enumerate(assignments)])
+    finally:
+        connection.close()
+
+
+def _patch_assignments(previous, steam_games, index, cache):
+    """
+    Carry previous matches over to the current library and match only the
+    games that were added, giving the same result a full rematch would.
+
+    The matcher is greedy in library order, so a patch is only exact when no
+    stored match would change. Two cases fall outside that, and None is
+    returned so the caller rematches in full:
+    - a removed game held an entry, which a later game may now prefer;
+    - an added game's best entry is held by a game later in the library,
+      which would have lost it to the added game.
+
+    Games are paired with their stored matches by name, so a library that was
+    only reordered keeps its previous results even though matching it in the
+    new order could pair duplicate or overlapping titles differently.
+
+    Returns (assignments, added, removed), or None.
+    """
+    # Pair current games with stored ones by name; duplicates pair up in order
+    stored = {}
+    for steam_game, match in previous:
+        stored.setdefault(steam_game, []).append(match)
+
+    kept = []
+    for steam_game in steam_games:
+        if not steam_game.strip():
+            continue
+        matches = stored.get(steam_game)
+        kept.append((steam_game, matches.pop(0)) if matches else (steam_game, False))
+
+    removed = sum(len(matches) for matches in stored.values())
+    if any(match for matches in stored.values() for match in matches):
+        return None
+
+    # Entries held by stored matches, by library position
+    held_at = {match[0]: position for position, (_, match) in enumerate(kept) if match}
+
+    # Replay the library in order: added games may only take entries that no
+    # game after them holds, which is what the greedy pass would have given them
+    assignments = []
+    taken = set()
+    added = 0
+    for position, (steam_game, match) in enumerate(kept):
+        if match is False:
+            added += 1
+            match = assign_matches([steam_game], index, cache, taken)[0][1]
+            if match is not None and held_at.get(match[0], -1) > position:
+                return None
+        elif match is not None:
+            taken.add(match[0])
+        assignments.append((steam_game, match))
+
+    return assignments, added, removed
+
+def check_profile(profiles_filename, steam_id, steam_games, compatibility_data, index, cache=None, full=False):
+    """
+    Match a profile's library, reusing its stored results where possible.
+
+    - Same library and database version as last time: the stored results are returned.
+    - Same database version, library changed: only added games are matched and
+      the stored results are patched, unless that could differ from a full
+      rematch (see _patch_assignments).
+    - New database version (or full=True): the whole library is rematched.
+
+    steam_games can be any iterable of names. For a full rematch it is matched
+    as it is consumed, so a library streamed from iter_steam_games is matched
+    while it downloads. An empty library is not stored.
+
+    Returns (matched_games, summary) where summary holds the mode used
+    ('unchanged', 'incremental' or 'full'), the added and removed counts and
+    the library fingerprint.
+    """
+    previous = None if full else load_profile(profiles_filename, steam_id)
+
+    mode = None
+    if previous is not None and previous["db_version"] == index.version:
+        steam_games = list(steam_games)
+        fingerprint = library_fingerprint(steam_games)
+        if previous["fingerprint"] == fingerprint:
+            assignments, mode, added, removed = previous["assignments"], 'unchanged', 0, 0
+        else:
+            patched = _patch_assignments(previous["assignments"], steam_games, index, cache)
+            if patched is not None:
+                assignments, added, removed = patched
+                mode = 'incremental'
+    if mode is None:
+        received = []
+
+        def receive():
+            for steam_game in steam_games:
+                received.append(steam_game)
+                yield steam_game
+
+        assignments = assign_matches(receive(), index, cache)
+        fingerprint = library_fingerprint(received)
+        mode, added, removed = 'full', len(assignments), 0
+
+    if mode != 'unchanged' and assignments:
+        save_profile(profiles_filename, steam_id, fingerprint, index.version, assignments, compatibility_data)
+
+    matched_games = [match_result(steam_game, match, compatibility_data) for steam_game, match in assignments]
+    return matched_games, {"mode": mode, "added": added, "removed": removed, "fingerprint": fingerprint}
+
+
+def affected_profiles(profiles_filename, diff):
+    """
+    Find the checked profiles that own games changed or removed in a diff
+    returned by history.diff_versions.
+
+    Only the names in the diff are looked up, through the wiki_name index, so
+    the work grows with the number of changed rows rather than with the number
+    of profiles. Matches are paired with the diff by name and URL, since the
+    wiki can list several rows under one name. Profiles are as of their last
+    check.
+
+    Returns a list of {"steam_id", "checked_at", "games"} sorted by steam_id,
+    where each game has its steam_name, the wiki name and url, a status of
+    'changed' or 'removed', and the changed columns (as in the diff).
+    """
+    changed = {}
+    for change in diff['changed']:
+        # A profile may have been matched before or after a URL change
+        for url in change['changes'].get('url', [change['url']]):
+            changed[(change['name'], url)] = change
+    removed = {(game['name'], game['url']): game for game in diff['removed']}
+    names = sorted({name for name, _ in changed.keys() | removed.keys()})
+    if not names or not os.path.exists(profiles_filename):
+        return []
+
+    connection = _connect(profiles_filename)
+    try:
+        matches = []
+        for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+            batch = names[start:start + LOOKUP_BATCH_SIZE]
+            matches += connection.execute(
+                "SELECT profile_games.steam_id, profiles.checked_at, profile_games.position, "
+                "profile_games.steam_name, profile_games.wiki_name, profile_games.wiki_url "
+                "FROM profile_games JOIN profiles ON profiles.steam_id = profile_games.steam_id "
+                f"WHERE profile_games.wiki_name IN ({', '.join('?' for _ in batch)})", batch)
+    finally:
+        connection.close()
+
+    profiles = {}
+    for steam_id, checked_at, position, steam_name, wiki_name, wiki_url in sorted(matches):
+        key = (wiki_name, wiki_url)
+        if key in changed:
+            game = {"steam_name": steam_name, "name": wiki_name, "url": changed[key]['url'],
+                    "status": 'changed', "changes": changed[key]['changes']}
+        elif key in removed:
+            game = {"steam_name": steam_name, "name": wiki_name, "url": wiki_url,
+                    "status": 'removed', "changes": {}}
+        else:
+            # Another row of the same name, which didn't change
+            continue
+        profile = profiles.setdefault(steam_id, {"steam_id": steam_id, "checked_at": checked_at, "games": []})
+        profile["games"].append(game)
+    return list(profiles.values())
@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+# Token-bucket limits per upstream host as (requests per second, burst size).
+# The bucket state lives in a small SQLite database shared by every process on
+# the machine (backend, daemon, GUI, cron-launched CLI runs), so together they
+# stay under the limit instead of each one firing at full speed.
+HOST_LIMITS = {
+    'steamcommunity.com': (0.5, 5),
+    'api.steampowered.com': (1.0, 10),
+    'www.applegamingwiki.com': (0.5, 3),
+}
+
+# How long a request may queue for a token before it is rejected, in seconds
+DEFAULT_DEADLINE = 30.0
+
+# Wait applied to every caller of a host that answered 429 without a Retry-After
+DEFAULT_BACKOFF = 60.0
+
+RATE_LIMIT_ENV_VAR = "MACLUDUS_RATE_LIMIT_DB"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    host TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    host TEXT PRIMARY KEY,
+    acquired INTEGER NOT NULL DEFAULT 0,
+    waited INTEGER NOT NULL DEFAULT 0,
+    wait_seconds REAL NOT NULL DEFAULT 0,
+    max_wait_seconds REAL NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    throttled INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request can't get a token for its host before its deadline."""
+
+    def __init__(self, host, retry_after):
+        super().__init__(f"Too many requests to {host}; try again in {retry_after:.1f} seconds")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def default_state_path():
+    """
+    Return the path of the shared limiter database.
+    Can be overridden with the MACLUDUS_RATE_LIMIT_DB environment variable.
+    """
+    if os.environ.get(RATE_LIMIT_ENV_VAR):
+        return os.environ[RATE_LIMIT_ENV_VAR]
+    uid = os.getuid() if hasattr(os, 'getuid') else 'user'
+    return os.path.join(tempfile.gettempdir(), f"macludus-ratelimit-{uid}.sqlite")
+
+
+def host_key(host, limits=HOST_LIMITS):
+    """Return the limits entry a host name falls under, e.g. 'steamcommunity.com'."""
+    host = (host or '').lower()
+    for known in limits:
+        if host == known or host.endswith('.' + known):
+            return known
+    return host
+
+
+class RateLimiter:
+    """
+    Cross-process token-bucket limiter.
+
+    acquire() reserves the next token for a host in one short transaction and
+    then sleeps until that token is due, so concurrent callers queue in order
+    rather than polling. A caller whose turn would come after its deadline is
+    rejected without reserving anything. Hosts not in limits are not limited.
+    """
+
+    def __init__(self, filename=None, limits=None):
+        self.filename = filename or default_state_path()
+        self.limits = HOST_LIMITS if limits is None else limits
+
+    def _connect(self):
+        connection = sqlite3.connect(self.filename, timeout=30, isolation_level=None)
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _reserve(self, connection, host, deadline):
+        """Take a token, returning how long to wait for it; raise if that passes the deadline."""
+        rate, capacity = self.limits[host]
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = connection.execute("SELECT tokens, updated FROM buckets WHERE host = ?", (host,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+
+            # Tokens go negative while callers queue; each one waits for its own token
+            wait = max(0.0, (1 - tokens) / rate)
+            connection.execute("INSERT OR IGNORE INTO stats (host) VALUES (?)", (host,))
+            if now + wait > deadline:
+                connection.execute("UPDATE stats SET rejected = rejected + 1 WHERE host = ?", (host,))
+                connection.execute("COMMIT")
+                raise RateLimitExceeded(host, wait)
+
+            connection.execute("INSERT OR REPLACE INTO buckets (host, tokens, updated) VALUES (?, ?, ?)",
+                               (host, tokens - 1, now))
+            connection.execute(
+                "UPDATE stats SET acquired = acquired + 1, waited = waited + ?, wait_seconds = wait_seconds + ?, "
+                "max_wait_seconds = max(max_wait_seconds, ?) WHERE host = ?",
+                (1 if wait > 0 else 0, wait, wait, host))
+            connection.execute("COMMIT")
+            return wait
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+
+    def acquire(self, host, timeout=DEFAULT_DEADLINE):
+        """
+        Wait for a token for host, for at most timeout seconds.
+        Returns the time spent waiting; raises RateLimitExceeded if the wait
+        would be longer than timeout.
+        """
+        host = host_key(host, self.limits)
+        if host not in self.limits:
+            return 0.0
+
+        connection = self._connect()
+        try:
+            wait = self._reserve(connection, host, time.time() + timeout)
+        finally:
+            connection.close()
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, host, retry_after=None):
+        """
+        Record that host answered 429 Too Many Requests, and hold back every
+        process's requests to it for retry_after seconds (or DEFAULT_BACKOFF).
+        """
+        host = host_key(host, self.limits)
+        if host not in self.limits:
+            return
+        rate, _ = self.limits[host]
+        retry_after = DEFAULT_BACKOFF if retry_after is None else retry_after
+
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = connection.execute("SELECT tokens, updated FROM buckets WHERE host = ?", (host,)).fetchone()
+            tokens = 0.0 if row is None else row[0] + (now - row[1]) * rate
+            connection.execute("INSERT OR REPLACE INTO buckets (host, tokens, updated) VALUES (?, ?, ?)",
+                               (host, min(tokens, -retry_after * rate), now))
+            connection.execute("INSERT OR IGNORE INTO stats (host) VALUES (?)", (host,))
+            connection.execute("UPDATE stats SET throttled = throttled + 1 WHERE host = ?", (host,))
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def stats(self):
+        """Return per-host counters shared by all processes, keyed by host."""
+        if not os.path.exists(self.filename):
+            return {}
+        connection = self._connect()
+        try:
+            return {
+                host: {
+                    "acquired": acquired,
+                    "waited": waited,
+                    "wait_seconds": round(wait_seconds, 3),
+                    "average_wait_seconds": round(wait_seconds / waited, 3) if waited else 0.0,
+                    "max_wait_seconds": round(max_wait_seconds, 3),
+                    "rejected": rejected,
+                    "throttled": throttled,
+                }
+                for host, acquired, waited, wait_seconds, max_wait_seconds, rejected, throttled
+                in connection.execute("SELECT host, acquired, waited, wait_seconds, max_wait_seconds, "
+                                      "rejected, throttled FROM stats ORDER BY host")
+            }
+        finally:
+            connection.close()
+
+
+# Limiter shared by every HTTP request this process makes
+_rate_limiter = None
+
+
+def get_rate_limiter():
+    """Return the process-wide RateLimiter, creating it on first use."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def main():
+    """
+    Show how long requests queued for each upstream host and how many were
+    rejected or throttled, across every MacLudus process on this machine.
+
+    Usage:
+      python ratelimit.py
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show shared rate limiter statistics')
+    parser.add_argument('--state', type=str, help=f'Limiter database (default: {default_state_path()})')
+    args = parser.parse_args()
+
+    stats = RateLimiter(args.state).stats()
+    if not stats:
+        print("No requests recorded yet.")
+        sys.exit(1)
+
+    print(f"{'Host':<26} {'Requests':>9} {'Waited':>7} {'Avg wait':>9} {'Max wait':>9} {'Rejected':>9} {'429s':>6}")
+    print("-" * 80)
+    for host, host_stats in stats.items():
+        print(f"{host:<26} {host_stats['acquired']:>9} {host_stats['waited']:>7} "
+              f"{host_stats['average_wait_seconds']:>8.2f}s {host_stats['max_wait_seconds']:>8.2f}s "
+              f"{host_stats['rejected']:>9} {host_stats['throttled']:>6}")
+
+
+if __name__ == "__main__":
+    main()
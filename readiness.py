@@ -0,0 +1,6 @@
+# Prefix of the line backend.py prints to stdout once it is accepting requests,
+# followed by a JSON object with its port and startup time. The Electron shell
+# (main.js, which keeps its own copy), the benchmark and the load test wait for
+# it to learn the port. It lives here so they can read it without importing
+# the backend and its Flask app.
+READY_MARKER = "MACLUDUS_BACKEND_READY"
@@ -0,0 +1,194 @@
+import os
+import sys
+import time
+import random
+import datetime
+import threading
+
+# How long to wait before trying again after a refresh failed, in seconds
+RETRY_DELAY = 15 * 60
+
+# How often the refresher checks whether the database was updated by someone
+# else (a manual update or a CLI run), which moves its schedule, in seconds
+POLL_INTERVAL = 60
+
+# macOS only lowers a single thread's priority through these setpriority()
+# arguments (sys/resource.h); Python's os module doesn't name them
+PRIO_DARWIN_THREAD = 3
+PRIO_DARWIN_BG = 0x1000
+
+
+def parse_window(text):
+    """
+    Parse an off-peak window given as 'START-END' in local hours, e.g. '2-6'
+    or '22-5' (across midnight). Returns (start, end) or None for an empty text.
+    """
+    if not text:
+        return None
+    try:
+        start, end = (int(hour) for hour in text.split('-'))
+    except ValueError:
+        raise ValueError(f"Refresh window must look like START-END in hours, e.g. 2-6, not {text!r}")
+    if not (0 <= start < 24 and 0 <= end < 24) or start == end:
+        raise ValueError(f"Refresh window hours must be different and between 0 and 23, not {text!r}")
+    return start, end
+
+
+def _in_window(moment, window):
+    start, end = window
+    if start < end:
+        return start <= moment.hour < end
+    return moment.hour >= start or moment.hour < end
+
+
+def _window_bounds(moment, window):
+    """Return (start, end) of the first window that ends after moment."""
+    start_hour, end_hour = window
+    day = moment.replace(minute=0, second=0, microsecond=0)
+    if _in_window(moment, window):
+        start = day.replace(hour=start_hour)
+        if start > moment:
+            start -= datetime.timedelta(days=1)
+    else:
+        start = day.replace(hour=start_hour)
+        if start <= moment:
+            start += datetime.timedelta(days=1)
+    end = start.replace(hour=end_hour)
+    if end <= start:
+        end += datetime.timedelta(days=1)
+    return start, end
+
+
+def next_refresh(last_updated, interval, jitter=0.0, window=None, now=None, rng=random):
+    """
+    Return when the next refresh should run, as a timestamp.
+
+    It is due interval seconds after last_updated (but not in the past), plus
+    a random delay of up to jitter seconds so several machines don't hit the
+    wiki at the same moment. With an off-peak window (start, end) in local
+    hours, the refresh is moved to the next window and the jitter is kept
+    inside it.
+    """
+    now = time.time() if now is None else now
+    due = max(last_updated + interval, now)
+    if window is None:
+        return due + rng.uniform(0, jitter)
+
+    moment = datetime.datetime.fromtimestamp(due)
+    start, end = _window_bounds(moment, window)
+    moment = max(moment, start)
+    span = min(jitter, (end - moment).total_seconds())
+    return moment.timestamp() + rng.uniform(0, span)
+
+
+def lower_thread_priority():
+    """
+    Run the calling thread at background priority, so a refresh doesn't slow
+    down request handling. Only macOS and Linux allow this per thread; elsewhere
+    the thread keeps its priority.
+    """
+    try:
+        if sys.platform == 'darwin':
+            # Also throttles the thread's disk and network I/O
+            os.setpriority(PRIO_DARWIN_THREAD, 0, PRIO_DARWIN_BG)
+        elif sys.platform.startswith('linux'):
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+class RefreshInProgress(Exception):
+    """Raised when a refresh is asked for while another one is still running."""
+
+
+class ScheduledRefresher:
+    """
+    Background thread that refreshes the compatibility database on a schedule.
+
+    The schedule follows the CSV file's modification time, so an update made
+    in the meantime (by a user or by another process) pushes the next refresh
+    back instead of being repeated. A missing database is fetched right away.
+    refresh is called with no arguments and does the actual work; it should
+    swap the new database in atomically.
+    """
+
+    def __init__(self, refresh, csv_filename, interval, jitter=0.0, window=None):
+        self.refresh = refresh
+        self.csv_filename = csv_filename
+        self.interval = interval
+        self.jitter = jitter
+        self.window = window
+        self.stopped = threading.Event()
+        self.thread = None
+        self.state = {
+            "enabled": True,
+            "interval_hours": interval / 3600,
+            "window": None if window is None else f"{window[0]}-{window[1]}",
+            "next_refresh": None,
+            "last_refresh": None,
+            "last_duration_seconds": None,
+            "last_error": None,
+            "running": False,
+        }
+
+    def _last_updated(self):
+        if os.path.exists(self.csv_filename):
+            return os.path.getmtime(self.csv_filename)
+        return None
+
+    def _refresh_once(self):
+        self.state["running"] = True
+        started = time.perf_counter()
+        try:
+            self.refresh()
+            self.state["last_error"] = None
+            return True
+        except Exception as e:
+            self.state["last_error"] = str(e)
+            print(f"Scheduled database refresh failed: {e}")
+            return False
+        finally:
+            self.state["running"] = False
+            self.state["last_refresh"] = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+            self.state["last_duration_seconds"] = round(time.perf_counter() - started, 1)
+
+    def _run(self):
+        lower_thread_priority()
+        while not self.stopped.is_set():
+            last_updated = self._last_updated()
+            if last_updated is None:
+                when = time.time()
+            else:
+                when = next_refresh(last_updated, self.interval, self.jitter, self.window)
+            self.state["next_refresh"] = datetime.datetime.fromtimestamp(when).isoformat(sep=' ', timespec='seconds')
+
+            # Sleep until the refresh is due, rescheduling if the database changes meanwhile
+            rescheduled = False
+            while time.time() < when:
+                if self.stopped.wait(min(POLL_INTERVAL, when - time.time())):
+                    return
+                if self._last_updated() != last_updated:
+                    rescheduled = True
+                    break
+            if rescheduled:
+                continue
+
+            if not self._refresh_once() and self.stopped.wait(RETRY_DELAY):
+                return
+
+    def start(self):
+        """Start the refresher thread."""
+        self.thread = threading.Thread(target=self._run, name="database-refresher", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the refresher thread, waiting up to timeout seconds (or for as
+        long as it takes) for it to exit. A refresh in progress is finished
+        first; if the timeout runs out before that, it is left to end with the
+        process, which only loses the refresh since the database is swapped
+        in atomically.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
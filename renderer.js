@@ -48,7 +48,7 @@ function updateStatus(text) {
 // Helper function to check if database exists and show last update time
 async function checkDatabaseStatus() {
     try {
-        const response = await window.api.fetch('http://localhost:5000/database-status', { method: 'GET' });
+        const response = await window.api.fetch('/database-status', { method: 'GET' });
         if (response.exists) {
             updateStatus(`Database last updated: ${response.last_updated}`);
         } else {
@@ -105,6 +105,27 @@ function displayResults(username, games) {
     resultsTextarea.value = header + rows;
 }
 
+// Display names for the summary's best_method keys
+const METHOD_LABELS = {
+    native: 'Native',
+    rosetta_2: 'Rosetta 2',
+    crossover: 'CrossOver',
+    wine: 'Wine',
+    parallels: 'Parallels',
+    linux_arm: 'Linux ARM',
+    not_working: 'Not working',
+    unknown: 'No information'
+};
+
+// Helper function to display the library summary returned with the results
+function displaySummary(summary) {
+    const games = summary.games;
+    const parts = Object.entries(summary.best_method)
+        .filter(([, count]) => count > 0 && games > 0)
+        .map(([method, count]) => `${METHOD_LABELS[method] || method}: ${count} (${Math.round(100 * count / games)}%)`);
+    document.getElementById('summary').textContent = `${games} games. Best way to run: ${parts.join(', ')}`;
+}
+
 // Update Database button click handler
 document.getElementById('updateDatabase').addEventListener('click', async () => {
     console.log('Update Database button clicked.');
@@ -114,7 +135,7 @@ document.getElementById('updateDatabase').addEventListener('click', async () =>
     updateProgress(true);
 
     try {
-        const response = await window.api.fetch('http://localhost:5000/update-database', { 
+        const response = await window.api.fetch('/update-database', { 
             method: 'POST' 
         });
 
@@ -152,7 +173,7 @@ document.getElementById('checkCompatibility').addEventListener('click', async ()
     updateProgress(true);
 
     try {
-        const response = await window.api.fetch('http://localhost:5000/check-compatibility', {
+        const response = await window.api.fetch('/check-compatibility', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -168,6 +189,7 @@ document.getElementById('checkCompatibility').addEventListener('click', async ()
         if (response.matched_games) {
             matchedGames = response.matched_games;
             displayResults(response.username, matchedGames);
+            if (response.summary) displaySummary(response.summary);
             updateStatus(`Found ${response.game_count} games for ${response.username}. Matched with compatibility data.`);
             document.getElementById('saveResults').disabled = false;
         } else if (response.error) {
@@ -197,6 +219,10 @@ document.getElementById('saveResults').addEventListener('click', async () => {
             defaultPath: 'compatibility_results.csv',
             filters: [
                 { name: 'CSV Files', extensions: ['csv'] },
+                { name: 'Excel Files', extensions: ['xlsx'] },
+                { name: 'JSON Lines Files', extensions: ['jsonl'] },
+                { name: 'Parquet Files', extensions: ['parquet'] },
+                { name: 'Arrow IPC Files', extensions: ['arrow'] },
                 { name: 'All Files', extensions: ['*'] }
             ]
         });
@@ -205,7 +231,7 @@ document.getElementById('saveResults').addEventListener('click', async () => {
             return; // User cancelled
         }
 
-        const response = await window.api.fetch('http://localhost:5000/save-results', {
+        const response = await window.api.fetch('/save-results', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -246,5 +272,20 @@ document.querySelectorAll('.checkbox-item input[type="checkbox"]').forEach(check
 
 // Initialize the application
 document.addEventListener('DOMContentLoaded', async () => {
+    updateStatus('Starting backend...');
+
+    // Requests are queued until the backend is ready, so wait for it first and
+    // show how long it took for the app to become interactive
+    try {
+        const info = await window.api.getBackendInfo();
+        const interactiveMs = Math.round(performance.now());
+        document.getElementById('readyTime').textContent =
+            `Ready in ${interactiveMs} ms (backend startup ${info.launch_ms} ms)`;
+    } catch (error) {
+        console.error('Backend failed to start:', error);
+        updateStatus(`Backend failed to start: ${error.message}`);
+        return;
+    }
+
     await checkDatabaseStatus();
 });
@@ -1,11 +1,55 @@
-import pandas as pd
-import requests
 import re
 import json
 import os
 import datetime
 import time
-from bs4 import BeautifulSoup
+
+from storage import STATUS_FIELDS, GameRecord, load_compatibility_data, write_csv_rows
+from export import export_excel_in_background, save_rows
+from history import history_filename_for, record_snapshot
+from ratelimit import RateLimitExceeded, get_rate_limiter
+
+# requests and BeautifulSoup are imported inside the functions that use them so
+# that `python scrape.py --help` and modules importing helpers from here don't
+# pay for loading them up front.
+
+# Upstream base URLs; overridable so load tests can point them at local stubs
+STEAM_COMMUNITY_URL = os.environ.get("MACLUDUS_STEAM_COMMUNITY_URL", "https://steamcommunity.com")
+STEAM_API_URL = os.environ.get("MACLUDUS_STEAM_API_URL", "https://api.steampowered.com")
+
+# Shared HTTP session, created on first use so connections to Steam and the wiki
+# are pooled across calls (and across requests in long-running processes)
+_http_session = None
+
+
+def get_http_session():
+    """
+    Return the process-wide requests.Session, creating it on first use.
+
+    Every request made through it first waits for a token from the shared
+    cross-process rate limiter (see ratelimit.py), and a 429 answer makes all
+    processes back off from that host. RateLimitExceeded is raised if a
+    request would have to queue past its deadline.
+    """
+    global _http_session
+    if _http_session is None:
+        import requests
+        from urllib.parse import urlparse
+
+        class RateLimitedSession(requests.Session):
+            def request(self, method, url, *args, **kwargs):
+                host = urlparse(url).hostname
+                get_rate_limiter().acquire(host)
+                response = super().request(method, url, *args, **kwargs)
+                if response.status_code == 429:
+                    retry_after = response.headers.get('Retry-After')
+                    get_rate_limiter().penalize(
+                        host, float(retry_after) if retry_after and retry_after.isdigit() else None)
+                return response
+
+        _http_session = RateLimitedSession()
+    return _http_session
+
 
 
 def extract_username_from_url(profile_url):
@@ -72,11 +116,13 @@ def extract_steam_id(profile_url):
         # Note: This requires a Steam API key, which we don't have
         # For this implementation, we'll use a public endpoint that doesn't require an API key
         try:
-            response = requests.get(f"https://steamcommunity.com/id/{vanity_name}?xml=1")
+            response = get_http_session().get(f"{STEAM_COMMUNITY_URL}/id/{vanity_name}?xml=1")
             if response.status_code == 200:
                 steamid64_match = re.search(r'<steamID64>(\d+)</steamID64>', response.text)
                 if steamid64_match:
                     return steamid64_match.group(1)
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             print(f"Error resolving vanity URL: {e}")
 
@@ -122,137 +168,494 @@ def normalize_game_name(name):
 
     return name
 
-def match_games_with_compatibility(steam_games, compatibility_data):
+class CompatibilityIndex:
     """
-    Match Steam games with compatibility data from Apple Gaming Wiki.
-    Returns a list of dictionaries with game name and compatibility info.
-
-    Matching algorithm:
-    1. Try exact match on original name
-    2. Try exact match on normalized name
-    3. Try partial match on original name (with improved logic to avoid duplicate matches)
-    4. Try partial match on normalized name (with improved logic to avoid duplicate matches)
-    5. If no match found, add game with unknown compatibility
+    Precomputed lookup structures over the compatibility data.
+    Building this once and reusing it across checks avoids re-normalizing every
+    wiki entry each time match_games_with_compatibility runs.
     """
-    matched_games = []
 
-    # Create a set to track which compatibility games have been matched
-    matched_compatibility_indices = set()
+    def __init__(self, compatibility_data):
+        self.games = compatibility_data
+        self.lower_names = [game['name'].lower() for game in compatibility_data]
+        self.normalized_names = [normalize_game_name(game['name']) for game in compatibility_data]
+
+        # Map each (lowercase or normalized) name to the indices that carry it, in order
+        self.by_lower_name = {}
+        for i, name in enumerate(self.lower_names):
+            self.by_lower_name.setdefault(name, []).append(i)
+
+        self.by_normalized_name = {}
+        for i, name in enumerate(self.normalized_names):
+            self.by_normalized_name.setdefault(name, []).append(i)
+
+        self._version = None
+
+    @property
+    def version(self):
+        """
+        Fingerprint of the compatibility data, computed on first use.
+        Identical data gives the same version, so memoized matches stay valid
+        across reloads and become unreachable as soon as the data changes.
+        """
+        if self._version is None:
+            import hashlib
+            digest = hashlib.sha1()
+            for game in self.games:
+                digest.update(json.dumps(dict(game), sort_keys=True, default=str).encode('utf-8'))
+            self._version = digest.hexdigest()
+        return self._version
+
+class MatchCache:
+    """
+    Bounded LRU memo of ranked match candidates, keyed by (database version,
+    raw Steam name) and shared across users and requests.
+
+    Each entry is (candidates, next_tier): the candidates of the tiers ranked
+    so far and the first tier not ranked yet (TIER_UNMATCHED once all are).
+    Tiers are ranked only as far as a check needs them, so most entries hold
+    just the cheap exact tiers. Steam libraries overlap heavily, so most names
+    have already been ranked by an earlier check; matching a library then only
+    runs the cheap greedy de-duplication over the cached candidates. Keys
+    include the database version, so a refresh invalidates every entry
+    without any explicit flush.
+    """
 
-    # Create a normalized version of compatibility data for better matching
-    normalized_compatibility_data = []
-    for game in compatibility_data:
-        normalized_game = game.copy()
-        normalized_game['normalized_name'] = normalize_game_name(game['name'])
-        normalized_compatibility_data.append(normalized_game)
+    def __init__(self, maxsize=50000, filename=None):
+        import threading
+        from collections import OrderedDict
+
+        self.maxsize = maxsize
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if filename and os.path.exists(filename):
+            self.load()
+
+    def get(self, version, steam_game):
+        key = (version, steam_game)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, version, steam_game, entry):
+        with self.lock:
+            self.entries[(version, steam_game)] = entry
+            self.entries.move_to_end((version, steam_game))
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def load(self):
+        """Load persisted entries from self.filename, ignoring an unreadable file."""
+        try:
+            with open(self.filename, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load match cache from {self.filename}: {e}")
+            return
+        with self.lock:
+            for version, steam_game, candidates, *next_tier in data.get("entries", [])[-self.maxsize:]:
+                # Files saved before tiers were cached as needed hold complete rankings
+                next_tier = next_tier[0] if next_tier else TIER_UNMATCHED
+                self.entries[(version, steam_game)] = (tuple(tuple(candidate) for candidate in candidates),
+                                                       next_tier)
+
+    def save(self, versions=None):
+        """
+        Persist entries to self.filename. If versions is given, only entries for
+        those database versions are kept, so stale versions don't accumulate on disk.
+        """
+        if not self.filename:
+            return
+        with self.lock:
+            entries = [[version, steam_game, candidates, next_tier]
+                       for (version, steam_game), (candidates, next_tier) in self.entries.items()
+                       if versions is None or version in versions]
+        temp_filename = self.filename + ".tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump({"entries": entries}, f)
+        os.replace(temp_filename, self.filename)
+
+class CompatibilityCache:
+    """
+    Compatibility databases held in memory by long-running processes (the
+    backend and the daemon), keyed by CSV path. Each database is reloaded and
+    re-indexed when its file changes on disk.
+    """
 
-    # Process Steam games
-    for steam_game in steam_games:
-        normalized_steam_game = normalize_game_name(steam_game)
+    def __init__(self):
+        import threading
+        self.lock = threading.Lock()
+        self.databases = {}
+
+    def get(self, csv_filename):
+        """Return (compatibility_data, index) for a CSV file, loading it if needed."""
+        mtime = os.path.getmtime(csv_filename)
+        with self.lock:
+            cached = self.databases.get(csv_filename)
+            if cached and cached[0] == mtime:
+                return cached[1], cached[2]
+
+            compatibility_data = load_compatibility_data(csv_filename)
+            index = CompatibilityIndex(compatibility_data)
+            self.databases[csv_filename] = (mtime, compatibility_data, index)
+            print(f"Loaded compatibility data for {len(compatibility_data)} games from {csv_filename}")
+            return compatibility_data, index
+
+    def replace(self, csv_filename, games):
+        """
+        Write games to csv_filename and make them its loaded database in one step.
+
+        The records and index are built before the file is replaced, so other
+        threads keep using the previous snapshot until the new one is ready and
+        never have to load it themselves. Returns (compatibility_data, index).
+        """
+        compatibility_data = [GameRecord.from_row(game) for game in games]
+        index = CompatibilityIndex(compatibility_data)
+        # Hash the rows now rather than in the first request that needs the version
+        index.version
+
+        with self.lock:
+            write_csv_rows(csv_filename, games)
+            self.databases[csv_filename] = (os.path.getmtime(csv_filename), compatibility_data, index)
+        return compatibility_data, index
+
+    def versions(self):
+        """Return the versions of the currently loaded databases."""
+        with self.lock:
+            return {index.version for _, _, index in self.databases.values()}
+
+# Match tiers, in the order they are tried
+TIER_EXACT = 1
+TIER_NORMALIZED = 2
+TIER_PARTIAL = 3
+TIER_PARTIAL_NORMALIZED = 4
+# Not a tier that is tried: the game matched nothing
+TIER_UNMATCHED = 5
+
+TIER_NAMES = {
+    TIER_EXACT: 'exact',
+    TIER_NORMALIZED: 'normalized',
+    TIER_PARTIAL: 'partial',
+    TIER_PARTIAL_NORMALIZED: 'partial_normalized',
+    TIER_UNMATCHED: 'unmatched',
+}
+
+# Candidates listed after the chosen match in explain mode
+EXPLAIN_RUNNER_UPS = 3
+
+# Candidates kept per name in the memo; if every one of them is already taken
+# by other games in the library, the name is ranked again in full
+MAX_CACHED_CANDIDATES = 16
+
+def _trace_tier(trace, tier, scanned, started, scores=()):
+    """Record one tier of a traced ranking that started at the given perf_counter time."""
+    trace["seconds"][tier] = time.perf_counter() - started
+    trace["scanned"][tier] = scanned
+    for score, i in scores:
+        trace["scores"][(i, tier)] = score
+
+def iter_tier_candidates(steam_game, index, trace=None, first_tier=TIER_EXACT):
+    """
+    Yield the ranked candidates for a Steam game name one tier at a time, as
+    lists of (entry index, tier) pairs: exact matches, then normalized
+    matches, then partial matches on the original and normalized names, each
+    by descending score and then position. A tier is only computed when the
+    caller asks for it, so a caller that finds its match in an exact tier
+    never pays for the partial tiers, which scan the whole database.
+    Tiers before first_tier are skipped, for a caller that already has them.
+
+    If trace is a dictionary, it is filled in with the time spent in each tier
+    computed ("seconds"), the number of entries it examined ("scanned"), both
+    keyed by tier, and the score of each candidate ("scores", keyed by
+    (entry index, tier)).
+    """
+    # Tiers are timed from when they are resumed, not counting the caller's work
+    if trace is not None:
+        trace.update(seconds={}, scanned={}, scores={})
+        started = time.perf_counter()
+
+    steam_game_lower = steam_game.lower()
+    normalized_steam_game = normalize_game_name(steam_game)
+
+    # 1. Exact match on original name
+    if first_tier <= TIER_EXACT:
+        candidates = [(i, TIER_EXACT) for i in index.by_lower_name.get(steam_game_lower, ())]
+        if trace is not None:
+            _trace_tier(trace, TIER_EXACT, len(candidates), started, [(1.0, i) for i, _ in candidates])
+        yield candidates
+        if trace is not None:
+            started = time.perf_counter()
+
+    # 2. Exact match on normalized name
+    if first_tier <= TIER_NORMALIZED:
+        candidates = [(i, TIER_NORMALIZED) for i in index.by_normalized_name.get(normalized_steam_game, ())]
+        if trace is not None:
+            _trace_tier(trace, TIER_NORMALIZED, len(candidates), started, [(1.0, i) for i, _ in candidates])
+        yield candidates
+        if trace is not None:
+            started = time.perf_counter()
+
+    # 3. Partial match on original name (prioritize more specific matches)
+    if first_tier <= TIER_PARTIAL:
+        partial = []
+        for i, game_name_lower in enumerate(index.lower_names):
+            # Calculate a match score based on string similarity
+            # Higher score means better match
+            score = 0
+            if steam_game_lower in game_name_lower:
+                # If Steam game is a substring of compatibility game
+                score = len(steam_game) / len(index.games[i]['name'])
+            elif game_name_lower in steam_game_lower:
+                # If compatibility game is a substring of Steam game
+                score = len(index.games[i]['name']) / len(steam_game)
+
+            if score > 0.5:  # Threshold to ensure good matches
+                partial.append((-score, i))
+        if trace is not None:
+            _trace_tier(trace, TIER_PARTIAL, len(index.lower_names), started,
+                        [(-score, i) for score, i in partial])
+        yield [(i, TIER_PARTIAL) for _, i in sorted(partial)]
+        if trace is not None:
+            started = time.perf_counter()
+
+    # 4. Partial match on normalized name (prioritize more specific matches)
+    partial = []
+    # Names that normalize to nothing (e.g. a bare year such as "1993") can't
+    # be scored; they only ever match through the exact tiers
+    if normalized_steam_game:
+        for i, normalized_name in enumerate(index.normalized_names):
+            if not normalized_name:
+                continue
+            score = 0
+            if normalized_steam_game in normalized_name:
+                # If normalized Steam game is a substring of normalized compatibility game
+                score = len(normalized_steam_game) / len(normalized_name)
+            elif normalized_name in normalized_steam_game:
+                # If normalized compatibility game is a substring of normalized Steam game
+                score = len(normalized_name) / len(normalized_steam_game)
 
-        # Skip empty game names
-        if not steam_game.strip():
-            continue
+            if score > 0.5:  # Threshold to ensure good matches
+                partial.append((-score, i))
+    if trace is not None:
+        _trace_tier(trace, TIER_PARTIAL_NORMALIZED, len(index.normalized_names) if normalized_steam_game else 0,
+                    started, [(-score, i) for score, i in partial])
+    yield [(i, TIER_PARTIAL_NORMALIZED) for _, i in sorted(partial)]
 
-        # 1. Try exact match on original name
-        found_match = False
-        for i, game in enumerate(compatibility_data):
-            if i in matched_compatibility_indices:
-                continue  # Skip already matched games
+def rank_until_free(steam_game, index, taken, candidates=(), next_tier=TIER_EXACT):
+    """
+    Extend a ranking of a Steam game's candidates (see iter_tier_candidates)
+    that holds every tier before next_tier, all of them in taken, one tier at
+    a time until it has an entry not in taken.
 
-            if game['name'].lower() == steam_game.lower():
-                matched_games.append(game)
-                matched_compatibility_indices.add(i)
-                found_match = True
-                break
+    Returns (match, candidates, next_tier): the first free (entry index, tier)
+    or None, the extended ranking as a list, and the first tier still missing
+    from it (TIER_UNMATCHED once every tier is ranked).
+    """
+    candidates = list(candidates)
+    match = None
+    for tier_candidates in iter_tier_candidates(steam_game, index, first_tier=next_tier):
+        next_tier += 1
+        candidates += tier_candidates
+        match = next(((i, tier) for i, tier in tier_candidates if i not in taken), None)
+        if match is not None:
+            break
+    return match, candidates, next_tier
+
+def first_free_candidate(steam_game, index, taken):
+    """
+    Return the best (entry index, tier) for a Steam game among the entries not
+    in taken, or None. Tiers are computed only until one has a free entry.
+    """
+    for tier_candidates in iter_tier_candidates(steam_game, index):
+        match = next(((i, tier) for i, tier in tier_candidates if i not in taken), None)
+        if match is not None:
+            return match
+    return None
 
-        if found_match:
-            continue
+def assign_matches(steam_games, index, cache=None, taken=None):
+    """
+    Pick the compatibility entry for each Steam game name.
 
-        # 2. Try exact match on normalized name
-        for i, game in enumerate(normalized_compatibility_data):
-            if i in matched_compatibility_indices:
-                continue  # Skip already matched games
+    Returns a list of (steam_game, match) pairs for the non-empty names, where
+    match is an (entry index, tier) pair or None. taken is the set of entry
+    indices already claimed by other games; it is updated in place, so a
+    library can be matched in several passes without two games sharing an entry.
 
-            if game['normalized_name'] == normalized_steam_game:
-                matched_games.append({k: v for k, v in game.items() if k != 'normalized_name'})
-                matched_compatibility_indices.add(i)
-                found_match = True
-                break
+    Matching stops at the first tier with a free entry. With a cache, the
+    tiers ranked for a name are memoized, and a later check only ranks further
+    tiers when every cached candidate is taken.
+    """
+    if taken is None:
+        taken = set()
 
-        if found_match:
+    assignments = []
+    for steam_game in steam_games:
+        # Skip empty game names
+        if not steam_game.strip():
             continue
 
-        # 3. Try partial match on original name (prioritize more specific matches)
-        best_match = None
-        best_match_index = -1
-        best_match_score = 0
-
-        for i, game in enumerate(compatibility_data):
-            if i in matched_compatibility_indices:
-                continue  # Skip already matched games
-
-            # Calculate a match score based on string similarity
-            # Higher score means better match
-            score = 0
-            if steam_game.lower() in game['name'].lower():
-                # If Steam game is a substring of compatibility game
-                score = len(steam_game) / len(game['name'])
-            elif game['name'].lower() in steam_game.lower():
-                # If compatibility game is a substring of Steam game
-                score = len(game['name']) / len(steam_game)
+        if cache is None:
+            match = first_free_candidate(steam_game, index, taken)
+        else:
+            candidates, next_tier = cache.get(index.version, steam_game) or ((), TIER_EXACT)
+            match = next(((i, tier) for i, tier in candidates if i not in taken), None)
+            if match is None and len(candidates) >= MAX_CACHED_CANDIDATES:
+                # The cached ranking was cut short and all of it is taken; rank without the cache
+                match = first_free_candidate(steam_game, index, taken)
+            elif match is None and next_tier < TIER_UNMATCHED:
+                # Rank the tiers not cached yet, only as far as needed, and cache them too
+                match, candidates, next_tier = rank_until_free(steam_game, index, taken, candidates, next_tier)
+                cache.put(index.version, steam_game, (tuple(candidates[:MAX_CACHED_CANDIDATES]), next_tier))
+
+        if match is not None:
+            taken.add(match[0])
+        assignments.append((steam_game, match))
+
+    return assignments
+
+def explain_matches(steam_games, index, taken=None, runner_ups=EXPLAIN_RUNNER_UPS):
+    """
+    Match like assign_matches without a cache, recording how each match was
+    made. Tiers are tried in order until one has a free entry, exactly as the
+    matcher does, so later tiers show up as not scanned.
+
+    Returns (assignments, explanations, timings). assignments is as returned
+    by assign_matches. explanations has one dictionary per assignment with
+    the tier that fired, the score, the number of distinct entries among the
+    candidates and how many of them ranked above the match but were already
+    taken by other games (an entry matching in several tiers counts once),
+    the runner-up candidates from the tiers that were tried, the number of
+    entries scanned and the time spent.
+    timings aggregates the time and entries scanned per tier, and counts
+    matches per tier, over all names.
+    """
+    if taken is None:
+        taken = set()
 
-            if score > best_match_score:
-                best_match_score = score
-                best_match = game
-                best_match_index = i
+    tiers = [TIER_EXACT, TIER_NORMALIZED, TIER_PARTIAL, TIER_PARTIAL_NORMALIZED]
+    seconds = dict.fromkeys(tiers, 0.0)
+    scanned = dict.fromkeys(tiers, 0)
+    matched = dict.fromkeys(list(tiers) + [TIER_UNMATCHED], 0)
 
-        if best_match and best_match_score > 0.5:  # Threshold to ensure good matches
-            matched_games.append(best_match)
-            matched_compatibility_indices.add(best_match_index)
+    assignments = []
+    explanations = []
+    for steam_game in steam_games:
+        if not steam_game.strip():
             continue
 
-        # 4. Try partial match on normalized name (prioritize more specific matches)
-        best_match = None
-        best_match_index = -1
-        best_match_score = 0
-
-        for i, game in enumerate(normalized_compatibility_data):
-            if i in matched_compatibility_indices:
-                continue  # Skip already matched games
+        trace = {}
+        candidates = []
+        position = None
+        for tier_candidates in iter_tier_candidates(steam_game, index, trace):
+            candidates += tier_candidates
+            position = next((n for n, (i, _) in enumerate(candidates) if i not in taken), None)
+            if position is not None:
+                break
+        match = None if position is None else candidates[position]
 
-            # Calculate a match score based on string similarity
-            score = 0
-            if normalized_steam_game in game['normalized_name']:
-                # If normalized Steam game is a substring of normalized compatibility game
-                score = len(normalized_steam_game) / len(game['normalized_name'])
-            elif game['normalized_name'] in normalized_steam_game:
-                # If normalized compatibility game is a substring of normalized Steam game
-                score = len(game['normalized_name']) / len(normalized_steam_game)
+        # Other entries in ranking order, each listed once, flagged if another game holds them
+        seen = {match[0]} if match else set()
+        others = []
+        for i, tier in candidates:
+            if len(others) == runner_ups:
+                break
+            if i in seen:
+                continue
+            seen.add(i)
+            others.append({"name": index.games[i]['name'], "tier": tier, "tier_name": TIER_NAMES[tier],
+                           "score": round(trace["scores"][(i, tier)], 3), "taken": i in taken})
+
+        tier = match[1] if match else TIER_UNMATCHED
+        explanations.append({
+            "tier": tier,
+            "tier_name": TIER_NAMES[tier],
+            "score": round(trace["scores"][match], 3) if match else None,
+            "candidates": len({i for i, _ in candidates}),
+            "skipped_taken": len({i for i, _ in candidates[:position]}),
+            "runner_ups": others,
+            "scanned": sum(trace["scanned"].values()),
+            "ms": round(sum(trace["seconds"].values()) * 1000, 3),
+        })
 
-            if score > best_match_score:
-                best_match_score = score
-                best_match = game
-                best_match_index = i
+        for t in tiers:
+            seconds[t] += trace["seconds"].get(t, 0.0)
+            scanned[t] += trace["scanned"].get(t, 0)
+        matched[tier] += 1
+        if match is not None:
+            taken.add(match[0])
+        assignments.append((steam_game, match))
+
+    timings = {
+        "names": len(assignments),
+        "total_ms": round(sum(seconds.values()) * 1000, 3),
+        "tiers": {
+            TIER_NAMES[t]: {"ms": round(seconds[t] * 1000, 3), "scanned": scanned[t], "matched": matched[t]}
+            for t in tiers
+        },
+        "unmatched": matched[TIER_UNMATCHED],
+    }
+    return assignments, explanations, timings
+
+def match_result(steam_game, match, compatibility_data):
+    """Build the result row for a Steam game from its assign_matches match."""
+    if match is not None:
+        i, tier = match
+        game = compatibility_data[i]
+        # Exact and partial matches on the original name return the entry itself,
+        # normalized matches a copy of it. GameRecords are read-only, so they
+        # are always shared rather than copied.
+        if tier in (TIER_EXACT, TIER_PARTIAL) or isinstance(game, GameRecord):
+            return game
+        return dict(game)
+
+    # No match found, add game with unknown compatibility
+    return GameRecord(steam_game, '', *(['Unknown'] * len(STATUS_FIELDS)))
+
+def match_games_with_compatibility(steam_games, compatibility_data, index=None, cache=None):
+    """
+    Match Steam games with compatibility data from Apple Gaming Wiki.
+    Returns a list of dictionaries with game name and compatibility info.
 
-        if best_match and best_match_score > 0.5:  # Threshold to ensure good matches
-            matched_games.append({k: v for k, v in best_match.items() if k != 'normalized_name'})
-            matched_compatibility_indices.add(best_match_index)
-            continue
+    Matching algorithm:
+    1. Try exact match on original name
+    2. Try exact match on normalized name
+    3. Try partial match on original name (with improved logic to avoid duplicate matches)
+    4. Try partial match on normalized name (with improved logic to avoid duplicate matches)
+    5. If no match found, add game with unknown compatibility
 
-        # 5. No match found, add game with unknown compatibility
-        matched_games.append({
-            'name': steam_game,
-            'url': '',
-            'native': 'Unknown',
-            'rosetta_2': 'Unknown',
-            'crossover': 'Unknown',
-            'wine': 'Unknown',
-            'parallels': 'Unknown',
-            'linux_arm': 'Unknown'
-        })
+    A CompatibilityIndex built from the same compatibility_data can be passed
+    in to skip rebuilding it on every call, and a MatchCache to reuse the
+    ranked candidates of names seen in earlier checks.
+    """
+    if index is None:
+        index = CompatibilityIndex(compatibility_data)
 
-    return matched_games
+    return [match_result(steam_game, match, compatibility_data)
+            for steam_game, match in assign_matches(steam_games, index, cache)]
 
 def get_steam_username(steam_id):
     """
@@ -260,12 +663,14 @@ def get_steam_username(steam_id):
     Uses a public endpoint that doesn't require an API key.
     """
     try:
+        from bs4 import BeautifulSoup
+
         # This endpoint is public and doesn't require an API key
-        url = f"https://steamcommunity.com/profiles/{steam_id}"
+        url = f"{STEAM_COMMUNITY_URL}/profiles/{steam_id}"
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers)
+        response = get_http_session().get(url, headers=headers)
 
         if response.status_code == 200:
             # Parse the HTML content
@@ -279,147 +684,317 @@ def get_steam_username(steam_id):
                 print("Could not find username on the profile page.")
         else:
             print(f"Failed to retrieve Steam profile. Status code: {response.status_code}")
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         print(f"Error fetching Steam username: {e}")
 
     return None
 
-def get_steam_games_api(steam_id, api_key):
+# Browser User-Agent sent with requests to the Steam community pages
+STEAM_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Bytes read from the network at a time when streaming a Steam page
+STEAM_CHUNK_SIZE = 64 * 1024
+
+def _hours_to_minutes(hours):
+    """Convert a Steam hours string such as '1,234.5' to whole minutes, or None."""
+    try:
+        return round(float(str(hours).replace(',', '')) * 60)
+    except ValueError:
+        return None
+
+def _steam_game_record(appid, name, playtime=None):
+    """Build the record yielded by the Steam library parsers."""
+    try:
+        appid = int(appid)
+    except (TypeError, ValueError):
+        appid = None
+    return {'appid': appid, 'name': name or '', 'playtime': playtime}
+
+def parse_steam_games_xml(chunks):
     """
-    Get the list of games owned by a Steam user using the official Steam API.
-    Requires a Steam API key.
+    Parse a Steam games list XML document (?xml=1) incrementally.
 
-    Args:
-        steam_id (str): The Steam ID of the user
-        api_key (str): The Steam API key
+    chunks is an iterable of bytes, such as response.iter_content(). Yields one
+    record per <game> element as soon as it has been read, as a dictionary
+    with 'appid', 'name' and 'playtime' (minutes on record, or None). Games
+    without a name are skipped, as are repeated app IDs. Raises
+    xml.etree.ElementTree.ParseError on malformed XML.
+    """
+    from xml.etree.ElementTree import XMLPullParser
 
-    Returns:
-        list: A list of game names owned by the user
+    parser = XMLPullParser(events=('end',))
+    seen = set()
+
+    def records():
+        for _, element in parser.read_events():
+            if element.tag != 'game':
+                continue
+            record = _steam_game_record(element.findtext('appID'), element.findtext('name'))
+            hours = element.findtext('hoursOnRecord')
+            if hours:
+                record['playtime'] = _hours_to_minutes(hours)
+            # Drop the element's children so memory stays flat on large libraries
+            element.clear()
+            if record['name'] and record['appid'] not in seen:
+                seen.add(record['appid'])
+                yield record
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from records()
+    parser.close()
+    yield from records()
+
+def parse_rggames(chunks):
+    """
+    Parse the `var rgGames = [...]` array of a Steam games page incrementally.
+
+    chunks is an iterable of bytes. The page is scanned for the array and each
+    game object is decoded as soon as it has been fully received, so records
+    are yielded while the rest of the page is still downloading. Records have
+    the same form as parse_steam_games_xml's. Yields nothing if the page has no
+    games array (e.g. a private profile); raises ValueError if it is truncated
+    or malformed.
+    """
+    import codecs
+
+    marker = 'var rgGames = '
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    state = 'search'  # then 'open', 'items', 'done'
+
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+
+        if state == 'search':
+            start = buffer.find(marker)
+            if start == -1:
+                # Keep just enough to find a marker split across two chunks
+                buffer = buffer[-len(marker):]
+                continue
+            buffer = buffer[start + len(marker):]
+            state = 'open'
+
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            if state == 'open':
+                if buffer[0] != '[':
+                    raise ValueError("rgGames is not an array")
+                buffer = buffer[1:]
+                state = 'items'
+            elif buffer[0] == ']':
+                state = 'done'
+                break
+            elif buffer[0] == ',':
+                buffer = buffer[1:]
+            else:
+                try:
+                    game, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    break  # Incomplete object; wait for more data
+                buffer = buffer[end:]
+                if isinstance(game, dict) and game.get('name'):
+                    playtime = game.get('playtime_forever')
+                    if playtime is None and game.get('hours_forever'):
+                        playtime = _hours_to_minutes(game['hours_forever'])
+                    yield _steam_game_record(game.get('appid'), game['name'], playtime)
+
+        if state == 'done':
+            return
+
+    if state != 'search':
+        raise ValueError("Games list ended before the rgGames array was complete")
+
+def _stream_steam_page(url):
+    """
+    Fetch a Steam community page as a stream of byte chunks.
+    Returns (status_code, chunks); chunks closes the response once consumed.
+    """
+    response = get_http_session().get(url, headers=STEAM_HEADERS, stream=True)
+
+    def chunks():
+        try:
+            yield from response.iter_content(chunk_size=STEAM_CHUNK_SIZE)
+        finally:
+            response.close()
+
+    if response.status_code != 200:
+        response.close()
+    return response.status_code, chunks()
+
+class SteamLibraryIncomplete(Exception):
+    """
+    Raised when a Steam library stops downloading after some of its games were
+    already yielded. The games received so far are only part of the library,
+    so they must not be matched and stored as if they were all of it.
+    """
+
+def iter_steam_games_api(steam_id, api_key):
+    """
+    Yield the games owned by a Steam user using the official Steam API, as
+    records with 'appid', 'name' and 'playtime' (minutes). Requires a Steam API key.
     """
     try:
         # Use the official Steam API to get the user's games
-        url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/?key={api_key}&steamid={steam_id}&include_appinfo=1&format=json"
-        response = requests.get(url)
+        url = f"{STEAM_API_URL}/IPlayerService/GetOwnedGames/v1/?key={api_key}&steamid={steam_id}&include_appinfo=1&format=json"
+        response = get_http_session().get(url)
 
         if response.status_code == 200:
             data = response.json()
             if 'response' in data and 'games' in data['response']:
                 games = data['response']['games']
-                game_names = [game.get('name', '') for game in games if game.get('name')]
-                print(f"Successfully extracted {len(game_names)} games using Steam API")
-                return game_names
+                records = [_steam_game_record(game.get('appid'), game['name'], game.get('playtime_forever'))
+                           for game in games if game.get('name')]
+                print(f"Successfully extracted {len(records)} games using Steam API")
+                yield from records
             else:
                 print("No games found in the API response. The user's game list may be private.")
         else:
             print(f"Failed to retrieve Steam games via API. Status code: {response.status_code}")
             if response.status_code == 403:
                 print("API key may be invalid or unauthorized.")
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         print(f"Error fetching Steam games via API: {e}")
 
-    return []
-
-def get_steam_games(steam_id, api_key=None):
+def get_steam_games_api(steam_id, api_key):
     """
-    Get the list of games owned by a Steam user.
-    If an API key is provided, uses the official Steam API.
-    Otherwise, tries the XML API first, then falls back to the JSON method if that fails.
+    Get the list of games owned by a Steam user using the official Steam API.
+    Requires a Steam API key.
 
     Args:
         steam_id (str): The Steam ID of the user
-        api_key (str, optional): The Steam API key. Defaults to None.
+        api_key (str): The Steam API key
 
     Returns:
         list: A list of game names owned by the user
     """
-    # If API key is provided, use the official Steam API
-    if api_key:
-        games = get_steam_games_api(steam_id, api_key)
-        if games:
-            return games
-        print("Steam API method failed, falling back to web scraping methods...")
-
-    # Try the XML method first
-    games = get_steam_games_xml(steam_id)
-    if games:
-        return games
+    return [game['name'] for game in iter_steam_games_api(steam_id, api_key)]
 
-    # If XML method fails, try the JSON method
+def iter_steam_games_xml(steam_id):
+    """
+    Yield the games owned by a Steam user from the XML API, one record at a
+    time while the document downloads.
+    This method works even for profiles that don't expose the JSON data.
+    """
+    count = 0
     try:
         # This endpoint is public and doesn't require an API key
-        url = f"https://steamcommunity.com/profiles/{steam_id}/games?tab=all"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
+        url = f"{STEAM_COMMUNITY_URL}/profiles/{steam_id}/games?tab=all&xml=1"
+        status_code, chunks = _stream_steam_page(url)
 
-        if response.status_code == 200:
-            # Extract the JSON data from the page
-            match = re.search(r'var rgGames = (\[.+?\]);', response.text, re.DOTALL)
-            if match:
-                games_json = match.group(1)
-                try:
-                    games = json.loads(games_json)
-                    return [game.get('name', '') for game in games if game.get('name')]
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing games JSON: {e}")
+        if status_code == 200:
+            for record in parse_steam_games_xml(chunks):
+                count += 1
+                yield record
+
+            if count:
+                print(f"Successfully extracted {count} unique games from XML API")
             else:
-                # If the user's game list is private, we won't be able to extract it
-                print("Could not find games list. The user's game list may be private.")
+                print("XML response does not contain game information.")
         else:
-            print(f"Failed to retrieve Steam games. Status code: {response.status_code}")
+            print(f"Failed to retrieve Steam games XML. Status code: {status_code}")
+    except RateLimitExceeded:
+        raise
     except Exception as e:
-        print(f"Error fetching Steam games: {e}")
-
-    return []
+        if count:
+            raise SteamLibraryIncomplete(f"Steam games XML stopped after {count} games: {e}") from e
+        print(f"Error fetching Steam games XML: {e}")
 
 def get_steam_games_xml(steam_id):
     """
     Get the list of games owned by a Steam user using the XML API.
     This method works even for profiles that don't expose the JSON data.
     """
+    return [game['name'] for game in iter_steam_games_xml(steam_id)]
+
+def iter_steam_games_page(steam_id):
+    """Yield the games owned by a Steam user from the rgGames array of their games page."""
+    count = 0
     try:
         # This endpoint is public and doesn't require an API key
-        url = f"https://steamcommunity.com/profiles/{steam_id}/games?tab=all&xml=1"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
-
-        if response.status_code == 200:
-            # Check if the response contains game information
-            if '<games>' in response.text:
-                # Extract game names and app IDs using regex
-                game_names = re.findall(r'<name><!\[CDATA\[(.*?)\]\]></name>', response.text)
-                app_ids = re.findall(r'<appID>(\d+)</appID>', response.text)
-
-                # Create a dictionary to deduplicate games by app ID
-                games_dict = {}
-                for i in range(min(len(game_names), len(app_ids))):
-                    app_id = app_ids[i]
-                    name = game_names[i]
-                    games_dict[app_id] = name
-
-                # Convert back to a list of unique game names
-                unique_games = list(games_dict.values())
-
-                if unique_games:
-                    print(f"Successfully extracted {len(unique_games)} unique games from XML API")
-                    return unique_games
-                else:
-                    print("Could not extract game names from XML response.")
-            else:
-                print("XML response does not contain game information.")
+        url = f"{STEAM_COMMUNITY_URL}/profiles/{steam_id}/games?tab=all"
+        status_code, chunks = _stream_steam_page(url)
+
+        if status_code == 200:
+            for record in parse_rggames(chunks):
+                count += 1
+                yield record
+            if not count:
+                # If the user's game list is private, we won't be able to extract it
+                print("Could not find games list. The user's game list may be private.")
         else:
-            print(f"Failed to retrieve Steam games XML. Status code: {response.status_code}")
+            print(f"Failed to retrieve Steam games. Status code: {status_code}")
+    except RateLimitExceeded:
+        raise
+    except ValueError as e:
+        if count:
+            raise SteamLibraryIncomplete(f"Steam games JSON ended after {count} games: {e}") from e
+        print(f"Error parsing games JSON: {e}")
     except Exception as e:
-        print(f"Error fetching Steam games XML: {e}")
+        if count:
+            raise SteamLibraryIncomplete(f"Steam games page stopped after {count} games: {e}") from e
+        print(f"Error fetching Steam games: {e}")
 
-    return []
+def iter_steam_games(steam_id, api_key=None):
+    """
+    Yield the games owned by a Steam user as records with 'appid', 'name' and
+    'playtime', while they are being downloaded, so callers can start matching
+    before the whole library has arrived.
+
+    If an API key is provided, uses the official Steam API. Otherwise (or if
+    that returns nothing), tries the XML API, then the games page. A source is
+    only abandoned for the next one if it yielded no games at all; one that
+    fails after yielding games raises SteamLibraryIncomplete.
+    """
+    # If API key is provided, use the official Steam API
+    if api_key:
+        found = False
+        for record in iter_steam_games_api(steam_id, api_key):
+            found = True
+            yield record
+        if found:
+            return
+        print("Steam API method failed, falling back to web scraping methods...")
+
+    # Try the XML method first, then the games page
+    found = False
+    for record in iter_steam_games_xml(steam_id):
+        found = True
+        yield record
+    if found:
+        return
+
+    yield from iter_steam_games_page(steam_id)
+
+def get_steam_games(steam_id, api_key=None):
+    """
+    Get the list of games owned by a Steam user.
+    If an API key is provided, uses the official Steam API.
+    Otherwise, tries the XML API first, then falls back to the JSON method if that fails.
+
+    Args:
+        steam_id (str): The Steam ID of the user
+        api_key (str, optional): The Steam API key. Defaults to None.
+
+    Returns:
+        list: A list of game names owned by the user
+    """
+    return [game['name'] for game in iter_steam_games(steam_id, api_key)]
 
 def get_game_info(url):
+    from bs4 import BeautifulSoup
+
     # Send a GET request to the URL
-    response = requests.get(url)
+    response = get_http_session().get(url)
 
     # Check if the request was successful
     if response.status_code == 200:
@@ -489,6 +1064,55 @@ def get_game_info(url):
         print(f"Failed to retrieve the page. Status code: {response.status_code}")
         return None
 
+def print_history_diff(diff):
+    """Print a diff returned by history.diff_versions in a readable form."""
+    print(f"\nChanges from version {diff['from_version']} to version {diff['to_version']}:")
+    print("-" * 80)
+    for change in diff['changed']:
+        details = ', '.join(f"{field}: {old or '-'} -> {new or '-'}" for field, (old, new) in change['changes'].items())
+        print(f"~ {change['name'][:39]:<40} {details}")
+    for game in diff['added']:
+        print(f"+ {game['name'][:39]:<40} (added)")
+    for game in diff['removed']:
+        print(f"- {game['name'][:39]:<40} (removed)")
+    print(f"\n{len(diff['changed'])} changed, {len(diff['added'])} added, {len(diff['removed'])} removed.")
+
+def print_match_explanations(assignments, explanations, timings):
+    """Print how each game was matched, as returned by explain_matches, and the time per tier."""
+    print("\nHow each game was matched:")
+    print("-" * 80)
+    print(f"{'Steam game':<36} {'Tier':<19} {'Score':>5} {'Skipped':>7} {'Scanned':>8} {'ms':>7}")
+    print("-" * 80)
+    for (steam_game, _), explanation in zip(assignments, explanations):
+        score = '' if explanation['score'] is None else f"{explanation['score']:.2f}"
+        print(f"{steam_game[:35]:<36} {explanation['tier_name']:<19} {score:>5} "
+              f"{explanation['skipped_taken']:>7} {explanation['scanned']:>8} {explanation['ms']:>7.2f}")
+        for runner_up in explanation['runner_ups']:
+            taken = ", taken" if runner_up['taken'] else ""
+            print(f"    also {runner_up['name'][:40]} ({runner_up['tier_name']}, {runner_up['score']:.2f}{taken})")
+
+    print(f"\nTime per tier over {timings['names']} games ({timings['total_ms']:.1f} ms in total):")
+    for tier_name, tier in timings['tiers'].items():
+        print(f"  {tier_name:<19} {tier['ms']:>9.1f} ms {tier['scanned']:>10} scanned {tier['matched']:>6} matched")
+    print(f"  {'unmatched':<19} {timings['unmatched']:>38} games")
+
+def print_affected_profiles(diff, profiles):
+    """Print the profiles returned by profiles.affected_profiles for a diff."""
+    print(f"\nChecked profiles owning games changed from version {diff['from_version']} "
+          f"to version {diff['to_version']}:")
+    print("-" * 80)
+    for profile in profiles:
+        print(f"{profile['steam_id']} (checked {profile['checked_at']}):")
+        for game in profile['games']:
+            if game['status'] == 'removed':
+                details = "(removed from the wiki)"
+            else:
+                details = ', '.join(f"{field}: {old or '-'} -> {new or '-'}"
+                                    for field, (old, new) in game['changes'].items())
+            print(f"  {game['steam_name'][:37]:<38} {details}")
+    games = sum(len(profile['games']) for profile in profiles)
+    print(f"\n{len(profiles)} profiles affected, {games} games in total.")
+
 def main():
     """
     Main function to handle command-line arguments and execute the appropriate actions.
@@ -516,6 +1140,45 @@ def main():
     - Specify custom output file:
       python scrape.py --output custom_filename.csv
 
+    - Save results as an Excel workbook (requires openpyxl), JSON Lines, or
+      Parquet / Arrow IPC (require pyarrow):
+      python scrape.py --output custom_filename.xlsx
+      python scrape.py --output custom_filename.jsonl
+      python scrape.py --output custom_filename.parquet
+
+    - Look up single games by name (prefix matches work for partial titles):
+      python scrape.py --search "portal 2"
+      python scrape.py --search "stardew val" --limit 5
+
+    - Browse the compatibility history recorded at each database update:
+      python scrape.py --history
+      python scrape.py --diff 3 7
+      python scrape.py --changes-since 2025-01-01
+
+    - List the checked profiles that own games whose status changed (in the
+      latest update, or with --diff / --changes-since):
+      python scrape.py --affected
+      python scrape.py --diff 3 7 --affected
+
+    - Print counts per compatibility method after the list of games:
+      python scrape.py --steam-profile https://steamcommunity.com/id/username --summary
+
+    - Show which matching tier fired for each game, its score, the runner-up
+      candidates and the time spent per tier (always matches in full, in-process):
+      python scrape.py --steam-profile https://steamcommunity.com/id/username --explain
+
+    - Run non-interactively (e.g. from cron), without the account confirmation prompt:
+      python scrape.py --steam-profile https://steamcommunity.com/id/username --yes
+
+    Results are kept per profile, so re-checking a profile only matches games
+    added since the last check (everything is rematched after a database
+    update, or with --full-recheck):
+      python scrape.py --steam-profile https://steamcommunity.com/id/username --yes --full-recheck
+
+    If a daemon started with `python daemon.py` is running, the database update,
+    profile lookup and matching are handed to it; otherwise they run in-process.
+    Use --no-daemon to always run in-process.
+
     Note: The script uses the Steam API to fetch games, not SteamDB. SteamDB URLs are supported
     for extracting the Steam ID, but the actual game data comes from Steam's public API.
     """
@@ -526,52 +1189,180 @@ def main():
     parser = argparse.ArgumentParser(description='Fetch Apple Silicon Mac compatibility for Steam games')
     parser.add_argument('--update', action='store_true', help='Force update of the compatibility database')
     parser.add_argument('--steam-profile', type=str, help='Steam profile URL to check games compatibility')
-    parser.add_argument('--output', type=str, help='Custom output file for compatibility results (CSV format)')
+    parser.add_argument('--output', type=str, help='Custom output file for compatibility results (format taken from the extension)')
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'xlsx', 'parquet', 'arrow'],
+                        help='Output format (default: from the --output extension, otherwise CSV)')
     parser.add_argument('--api-key', type=str, help='Steam API key (optional, will use web scraping if not provided)')
+    parser.add_argument('--search', type=str, help='Look up games by name in the compatibility database instead of checking a profile')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum number of --search results (default: 20)')
+    parser.add_argument('--history', action='store_true', help='List the stored versions of the compatibility database')
+    parser.add_argument('--diff', type=int, nargs='+', metavar='VERSION',
+                        help='Show changes between two versions (or from one version to the latest)')
+    parser.add_argument('--changes-since', type=str, metavar='YYYY-MM-DD',
+                        help='Show changes made to the compatibility database since a date')
+    parser.add_argument('--affected', action='store_true',
+                        help='List the checked profiles owning games changed in the latest update '
+                             '(or in the --diff / --changes-since range)')
+    parser.add_argument('--full-recheck', action='store_true',
+                        help='Rematch the whole library instead of reusing the results of the last check')
+    parser.add_argument('--summary', action='store_true',
+                        help='Also print how many games run natively, under Rosetta 2, CrossOver, etc.')
+    parser.add_argument('--explain', action='store_true',
+                        help='Show how each game was matched and the time spent per matching tier')
+    parser.add_argument('--yes', '-y', action='store_true', help='Skip the Steam account confirmation prompt')
+    parser.add_argument('--no-daemon', action='store_true', help="Don't use a running daemon even if one is available")
 
     args = parser.parse_args()
 
+    if args.diff and len(args.diff) > 2:
+        parser.error("--diff takes one or two version numbers")
+    if args.changes_since:
+        try:
+            datetime.datetime.strptime(args.changes_since, '%Y-%m-%d')
+        except ValueError:
+            parser.error("--changes-since must be a date in YYYY-MM-DD format")
+
     # URL of the Apple Gaming Wiki page
     wiki_url = "https://www.applegamingwiki.com/wiki/M1_compatible_games_master_list"
 
     # CSV file to store/read compatibility data
     csv_filename = "macludus_compatible_games.csv"
 
-    # Auto-update compatibility database if needed
-    should_update = args.update or should_update_database(csv_filename)
-
-    if should_update:
+    # Use a running daemon if there is one: it keeps the database loaded and
+    # indexed and its HTTP connections warm
+    use_daemon = False
+    if not args.no_daemon and not args.explain:
+        from daemon import daemon_request
+        use_daemon = daemon_request("ping") is not None
+
+    # Auto-update compatibility database if needed. A --search lookup only
+    # reads it, so it doesn't wait on a scrape of a merely old database.
+    # History reports don't read it at all, and an automatic update would
+    # record a version of its own that --affected would then report on
+    history_report = args.history or args.diff or args.changes_since or args.affected
+    if args.search is not None:
+        should_update = args.update or not os.path.exists(csv_filename)
+    elif history_report:
+        should_update = args.update
+    else:
+        should_update = args.update or should_update_database(csv_filename)
+
+    if should_update and use_daemon:
+        print("Updating compatibility database from Apple Gaming Wiki (via daemon)...")
+        response = daemon_request("update", csv_filename=os.path.abspath(csv_filename), wiki_url=wiki_url) or {}
+        if response.get("message"):
+            print(f"Successfully extracted information for {response['game_count']} games.")
+            print(f"Data saved to {csv_filename}")
+        else:
+            print(f"Error updating database: {response.get('error', 'daemon did not respond')}")
+            print("Will try to use existing database if available.")
+    elif should_update:
         print("Updating compatibility database from Apple Gaming Wiki...")
         try:
             games = get_game_info(wiki_url)
             if games:
                 print(f"Successfully extracted information for {len(games)} games.")
 
-                # Convert to DataFrame
-                df = pd.DataFrame(games)
-
                 # Save to CSV
-                df.to_csv(csv_filename, index=False)
+                write_csv_rows(csv_filename, games)
                 print(f"Data saved to {csv_filename}")
 
-                # Save to Excel (optional)
-                try:
-                    import openpyxl
-                    excel_filename = "macludus_compatible_games.xlsx"
-                    df.to_excel(excel_filename, index=False)
-                    print(f"Data also saved to {excel_filename}")
-                except ImportError:
+                # Keep a versioned copy so status changes can be diffed later
+                version = record_snapshot(history_filename_for(csv_filename), games)
+                print(f"Recorded as history version {version}")
+
+                # Export to Excel in the background (optional, needs openpyxl)
+                excel_filename = "macludus_compatible_games.xlsx"
+                excel_result = {}
+
+                def excel_done(status, error):
+                    excel_result.update(status=status, error=error)
+
+                def report_excel():
+                    # Reported once the run is over rather than from the export
+                    # thread, which could print over the confirmation prompt
+                    excel_thread.join()
+                    if excel_result.get('status') == 'written':
+                        print(f"Data also saved to {excel_filename}")
+                    elif excel_result.get('status') == 'failed':
+                        print(f"Error saving to Excel: {excel_result['error']}")
+
+                excel_thread = export_excel_in_background(csv_filename, excel_filename, excel_done)
+                if excel_thread:
+                    import atexit
+                    atexit.register(report_excel)
+                else:
                     print("Excel export skipped. To enable, install openpyxl: pip install openpyxl")
-                except Exception as e:
-                    print(f"Error saving to Excel: {e}")
             else:
                 print("Failed to extract game information. Will try to use existing database if available.")
         except Exception as e:
             print(f"Error updating database: {e}")
             print("Will try to use existing database if available.")
-    else:
+    elif os.path.exists(csv_filename):
         print(f"Using existing compatibility database (last updated: {datetime.datetime.fromtimestamp(os.path.getmtime(csv_filename)).strftime('%Y-%m-%d')})")
 
+    # Look up games in the SQLite store instead of checking a profile
+    if args.search is not None:
+        from store import ensure_store, search_games
+
+        if not os.path.isfile(csv_filename):
+            print(f"Compatibility database file '{csv_filename}' not found and could not be created.")
+            sys.exit(1)
+
+        results = search_games(ensure_store(csv_filename), args.search, args.limit)
+        if not results:
+            print(f"No games found matching '{args.search}'.")
+            sys.exit(1)
+
+        print(f"\nGames matching '{args.search}':")
+        print("-" * 80)
+        print(f"{'Game Name':<40} {'Native':<10} {'Rosetta 2':<10} {'CrossOver':<10} {'Wine':<10} {'Parallels':<10}")
+        print("-" * 80)
+        for game in results:
+            print(f"{game['name'][:39]:<40} {game['native']:<10} {game['rosetta_2']:<10} {game['crossover']:<10} {game['wine']:<10} {game['parallels']:<10}")
+        return
+
+    # Show the database history instead of checking a profile
+    if history_report:
+        from history import list_versions, diff_versions, changes_since
+
+        history_filename = history_filename_for(csv_filename)
+        versions = list_versions(history_filename)
+        if not versions:
+            print("No history recorded yet. History is kept from the next database update on.")
+            sys.exit(1)
+
+        if args.history:
+            print(f"\n{'Version':<10} {'Recorded':<22} {'Games':<10}")
+            print("-" * 42)
+            for version in versions:
+                print(f"{version['version']:<10} {version['created_at']:<22} {version['game_count']:<10}")
+            return
+
+        if args.diff:
+            known = {version['version'] for version in versions}
+            old_version = args.diff[0]
+            new_version = args.diff[1] if len(args.diff) > 1 else versions[-1]['version']
+            if old_version not in known or new_version not in known:
+                print("Unknown version. Use --history to list the stored versions.")
+                sys.exit(1)
+            diff = diff_versions(history_filename, old_version, new_version)
+        elif args.changes_since:
+            diff = changes_since(history_filename, args.changes_since)
+        else:
+            # --affected on its own covers the latest update
+            if len(versions) < 2:
+                print("Only one version recorded yet, so nothing has changed.")
+                sys.exit(1)
+            diff = diff_versions(history_filename, versions[-2]['version'], versions[-1]['version'])
+
+        if args.affected:
+            from profiles import affected_profiles, profiles_filename_for
+            print_affected_profiles(diff, affected_profiles(profiles_filename_for(csv_filename), diff))
+        else:
+            print_history_diff(diff)
+        return
+
     # Prompt for Steam profile URL if not provided
     steam_profile = args.steam_profile
     if not steam_profile:
@@ -586,25 +1377,46 @@ def main():
         print("Please check your internet connection and try again.")
         sys.exit(1)
 
-    # Try to load compatibility data from CSV
-    try:
-        compatibility_df = pd.read_csv(csv_filename)
-        compatibility_data = compatibility_df.to_dict('records')
-        print(f"Loaded compatibility data for {len(compatibility_data)} games.")
-    except Exception as e:
-        print(f"Error loading compatibility data: {e}")
-        print("The compatibility database file may be corrupted.")
-        sys.exit(1)
+    def load_compatibility():
+        try:
+            compatibility_data = load_compatibility_data(csv_filename)
+            print(f"Loaded compatibility data for {len(compatibility_data)} games.")
+            return compatibility_data
+        except Exception as e:
+            print(f"Error loading compatibility data: {e}")
+            print("The compatibility database file may be corrupted.")
+            sys.exit(1)
+
+    # Try to load compatibility data from CSV (the daemon already has it loaded)
+    if not use_daemon:
+        compatibility_data = load_compatibility()
+
+    # Extract Steam ID from profile URL and fetch the actual Steam username
+    if use_daemon:
+        response = daemon_request("resolve", steam_profile=steam_profile)
+        if response is None:
+            # The daemon died or stopped answering since it was pinged
+            print("The daemon did not respond; continuing without it.")
+            use_daemon = False
+            compatibility_data = load_compatibility()
+        elif response.get("error"):
+            print(f"Error: {response['error']}")
+            sys.exit(1)
+        else:
+            steam_id, steam_username = response.get("steam_id"), response.get("username")
+    if not use_daemon:
+        try:
+            steam_id = extract_steam_id(steam_profile)
+            steam_username = get_steam_username(steam_id) if steam_id else None
+        except RateLimitExceeded as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
-    # Extract Steam ID from profile URL
-    steam_id = extract_steam_id(steam_profile)
     if not steam_id:
         print(f"Could not extract Steam ID from URL: {steam_profile}")
         print("Please provide a valid Steam profile URL.")
         sys.exit(1)
 
-    # Fetch the actual Steam username
-    steam_username = get_steam_username(steam_id)
     if not steam_username:
         print(f"Could not fetch username for Steam ID: {steam_id}")
         print("The profile may be private or the Steam ID may be invalid.")
@@ -612,10 +1424,11 @@ def main():
 
     # Ask for user confirmation
     print(f"Found Steam account: {steam_username} (ID: {steam_id})")
-    confirmation = input("Is this the correct Steam account? (yes/no): ").strip().lower()
-    if confirmation != "yes" and confirmation != "y":
-        print("Exiting as requested.")
-        sys.exit(0)
+    if not args.yes:
+        confirmation = input("Is this the correct Steam account? (yes/no): ").strip().lower()
+        if confirmation != "yes" and confirmation != "y":
+            print("Exiting as requested.")
+            sys.exit(0)
 
     # Use the actual Steam username for the output filename if available
     # Otherwise, fall back to extracting from the URL
@@ -635,16 +1448,58 @@ def main():
     else:
         print("No Steam API key provided, using web scraping methods...")
 
-    steam_games = get_steam_games(steam_id, api_key)
+    if use_daemon:
+        # The daemon fetches the library and matches it against its loaded database
+        response = daemon_request("check", csv_filename=os.path.abspath(csv_filename),
+                                  steam_id=steam_id, api_key=api_key, full=args.full_recheck)
+        if response is None:
+            print("The daemon did not respond; matching in-process instead.")
+            use_daemon = False
+            compatibility_data = load_compatibility()
+        elif response.get("error"):
+            print(f"Error: {response['error']}")
+            sys.exit(1)
 
-    if not steam_games:
+    if use_daemon:
+        game_count = response.get("game_count", 0)
+        matched_games = response.get("matched_games")
+        recheck = response.get("recheck")
+    elif args.explain:
+        # Match without the cache and keep the trace; stored profile results are left alone
+        try:
+            steam_games = [game['name'] for game in iter_steam_games(steam_id, api_key)]
+        except (RateLimitExceeded, SteamLibraryIncomplete) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        assignments, explanations, timings = explain_matches(steam_games, CompatibilityIndex(compatibility_data))
+        matched_games = [match_result(steam_game, match, compatibility_data) for steam_game, match in assignments]
+        game_count = len(matched_games)
+        recheck = None
+    else:
+        # Match Steam games with compatibility data while the library downloads,
+        # reusing this profile's last results
+        from profiles import check_profile, profiles_filename_for
+
+        steam_games = (game['name'] for game in iter_steam_games(steam_id, api_key))
+        try:
+            matched_games, recheck = check_profile(
+                profiles_filename_for(csv_filename), steam_id, steam_games, compatibility_data,
+                CompatibilityIndex(compatibility_data), full=args.full_recheck)
+        except (RateLimitExceeded, SteamLibraryIncomplete) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        game_count = len(matched_games)
+
+    if not game_count:
         print("No games found. The user's game list may be private or empty.")
         sys.exit(1)
 
-    print(f"Found {len(steam_games)} games in the Steam library.")
+    print(f"Found {game_count} games in the Steam library.")
 
-    # Match Steam games with compatibility data
-    matched_games = match_games_with_compatibility(steam_games, compatibility_data)
+    if recheck and recheck["mode"] == 'unchanged':
+        print("Library and database unchanged since the last check; reusing its results.")
+    elif recheck and recheck["mode"] == 'incremental':
+        print(f"Matched {recheck['added']} new games ({recheck['removed']} removed since the last check).")
 
     # Display compatibility information
     print("\nCompatibility information for Steam games:")
@@ -655,13 +1510,20 @@ def main():
     for game in matched_games:
         print(f"{game['name'][:39]:<40} {game['native']:<10} {game['rosetta_2']:<10} {game['crossover']:<10} {game['wine']:<10} {game['parallels']:<10}")
 
+    if args.explain:
+        print_match_explanations(assignments, explanations, timings)
+
+    if args.summary:
+        from summary import print_summary, summarize_games
+
+        print_summary(summarize_games(matched_games), f"Summary for {steam_username}")
+
     # Determine output filename
     output_file = args.output if args.output else f"{username}_compatibility.csv"
 
     # Save results to CSV
     try:
-        output_df = pd.DataFrame(matched_games)
-        output_df.to_csv(output_file, index=False)
+        save_rows(output_file, matched_games, args.format)
         print(f"\nResults saved to {output_file}")
     except Exception as e:
         print(f"\nError saving results to {output_file}: {e}")
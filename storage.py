@@ -0,0 +1,180 @@
+import csv
+import os
+import tempfile
+import threading
+from collections.abc import Mapping
+
+# Columns written by get_game_info and returned by match_games_with_compatibility
+COMPATIBILITY_FIELDS = [
+    'name', 'url', 'native', 'rosetta_2', 'crossover', 'wine', 'parallels', 'linux_arm'
+]
+
+# Columns holding a compatibility status such as "Yes", "No" or "Unknown"
+STATUS_FIELDS = COMPATIBILITY_FIELDS[2:]
+
+
+def _umask_file_mode():
+    # The umask can only be read by setting it, so it is put back right away
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+# Mode for files written through a temporary file, which mkstemp creates as
+# 0600: the mode open() would have given a new file under the process umask
+FILE_MODE = _umask_file_mode()
+
+
+# Interned status values. Records store the small integer code of each status
+# instead of their own copy of strings like "Native" or "Unknown"; the table
+# grows when the wiki introduces a new value.
+STATUS_VALUES = ['', 'Unknown', 'Yes', 'No', 'Native', 'Partial']
+_status_codes = {value: code for code, value in enumerate(STATUS_VALUES)}
+_status_lock = threading.Lock()
+
+
+def status_code(value):
+    """Return the interned code of a status value, adding it to the table if new."""
+    value = '' if value is None else str(value)
+    code = _status_codes.get(value)
+    if code is None:
+        with _status_lock:
+            code = _status_codes.get(value)
+            if code is None:
+                code = _status_codes[value] = len(STATUS_VALUES)
+                STATUS_VALUES.append(value)
+    return code
+
+
+class GameRecord(Mapping):
+    """
+    Compact, read-only compatibility row.
+
+    Holds the name and URL as strings and each status as an interned code,
+    so a loaded database costs a fraction of a list of dictionaries. It reads
+    like a dictionary with the COMPATIBILITY_FIELDS keys (record['native'],
+    record.get(...)); call as_dict() where a real dictionary is needed, such
+    as for JSON.
+    """
+
+    __slots__ = ('name', 'url', '_native', '_rosetta_2', '_crossover', '_wine', '_parallels', '_linux_arm')
+
+    def __init__(self, name, url='', native='', rosetta_2='', crossover='', wine='', parallels='', linux_arm=''):
+        # Records are shared between users and requests, so attributes are only
+        # ever set here; __setattr__ refuses any later change
+        set_field = object.__setattr__
+        set_field(self, 'name', '' if name is None else str(name))
+        set_field(self, 'url', '' if url is None else str(url))
+        set_field(self, '_native', status_code(native))
+        set_field(self, '_rosetta_2', status_code(rosetta_2))
+        set_field(self, '_crossover', status_code(crossover))
+        set_field(self, '_wine', status_code(wine))
+        set_field(self, '_parallels', status_code(parallels))
+        set_field(self, '_linux_arm', status_code(linux_arm))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"GameRecord is read-only; can't set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"GameRecord is read-only; can't delete {name!r}")
+
+    def __reduce__(self):
+        # Copies and pickles are rebuilt through __init__, since __setattr__ is blocked
+        return (type(self), tuple(self[field] for field in COMPATIBILITY_FIELDS))
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a record from a dictionary (or record) with the CSV columns."""
+        if isinstance(row, cls):
+            return row
+        return cls(*(row.get(field, '') for field in COMPATIBILITY_FIELDS))
+
+    def __getitem__(self, field):
+        if field == 'name':
+            return self.name
+        if field == 'url':
+            return self.url
+        if field in STATUS_FIELDS:
+            return STATUS_VALUES[getattr(self, '_' + field)]
+        raise KeyError(field)
+
+    def __iter__(self):
+        return iter(COMPATIBILITY_FIELDS)
+
+    def __len__(self):
+        return len(COMPATIBILITY_FIELDS)
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'url': self.url,
+            'native': STATUS_VALUES[self._native],
+            'rosetta_2': STATUS_VALUES[self._rosetta_2],
+            'crossover': STATUS_VALUES[self._crossover],
+            'wine': STATUS_VALUES[self._wine],
+            'parallels': STATUS_VALUES[self._parallels],
+            'linux_arm': STATUS_VALUES[self._linux_arm],
+        }
+
+    def __repr__(self):
+        return f"GameRecord({self.as_dict()!r})"
+
+
+def as_dicts(rows):
+    """Convert records (or dictionaries) to plain dictionaries, e.g. for JSON."""
+    return [row.as_dict() if isinstance(row, GameRecord) else dict(row) for row in rows]
+
+
+def iter_csv_rows(filename):
+    """
+    Stream rows from a CSV file as dictionaries, one at a time.
+    Empty cells are returned as empty strings.
+    """
+    with open(filename, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def load_compatibility_data(filename):
+    """
+    Load the compatibility database into a list of GameRecords.
+    This is the pandas-free replacement for read_csv(...).to_dict('records').
+    """
+    return [GameRecord.from_row(row) for row in iter_csv_rows(filename)]
+
+
+def write_csv_rows(filename, rows, fieldnames=None):
+    """
+    Write an iterable of dictionaries to a CSV file, one row at a time.
+
+    The file is written to a temporary file in the same directory and moved into
+    place once complete, so readers never see a half-written database.
+    If fieldnames is not given, the keys of the first row are used.
+
+    Returns the number of rows written.
+    """
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if fieldnames is None:
+        fieldnames = list(first_row.keys()) if first_row else COMPATIBILITY_FIELDS
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.csv')
+    count = 0
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            if first_row is not None:
+                writer.writerow(first_row)
+                count += 1
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        os.chmod(temp_path, FILE_MODE)
+        os.replace(temp_path, filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return count
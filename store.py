@@ -0,0 +1,207 @@
+import os
+import re
+import sqlite3
+import tempfile
+
+from scrape import normalize_game_name
+from storage import COMPATIBILITY_FIELDS, FILE_MODE, STATUS_FIELDS, iter_csv_rows
+
+
+def store_filename_for(csv_filename):
+    """Return the SQLite store path kept next to a compatibility CSV file."""
+    return os.path.splitext(csv_filename)[0] + ".sqlite"
+
+
+def build_store(db_filename, games, source_mtime=None):
+    """
+    Build a SQLite store from get_game_info output (or rows read back from CSV).
+
+    The store has indexed lowercase and normalized names, one index per status
+    column, and an FTS5 index on titles when SQLite supports it. It is built in
+    a temporary file and moved into place, so readers always see a complete store.
+
+    Returns the number of games stored.
+    """
+    temp_path, count = stage_store(db_filename, games)
+    install_store(temp_path, db_filename, source_mtime)
+    return count
+
+
+def stage_store(db_filename, games):
+    """
+    Build a store like build_store, but leave it in a temporary file next to
+    db_filename, so it can be prepared before the CSV it belongs to is written.
+    Move it into place with install_store (or delete it).
+
+    Returns (temporary path, number of games stored).
+    """
+    directory = os.path.dirname(os.path.abspath(db_filename))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.sqlite')
+    os.close(fd)
+
+    try:
+        connection = sqlite3.connect(temp_path)
+        try:
+            columns = ', '.join(f"{field} TEXT NOT NULL DEFAULT ''" for field in COMPATIBILITY_FIELDS)
+            connection.execute(f"CREATE TABLE games (id INTEGER PRIMARY KEY, {columns}, "
+                               "name_lower TEXT NOT NULL, normalized_name TEXT NOT NULL)")
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+
+            def values(game):
+                row = ['' if game.get(field) is None else str(game.get(field)) for field in COMPATIBILITY_FIELDS]
+                return row + [row[0].lower(), normalize_game_name(row[0])]
+
+            # executemany consumes the generator row by row, so games can be a stream
+            placeholders = ', '.join('?' for _ in range(len(COMPATIBILITY_FIELDS) + 2))
+            connection.executemany(
+                f"INSERT INTO games ({', '.join(COMPATIBILITY_FIELDS)}, name_lower, normalized_name) "
+                f"VALUES ({placeholders})", (values(game) for game in games))
+            count = connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+            connection.execute("CREATE INDEX games_name_lower ON games (name_lower)")
+            connection.execute("CREATE INDEX games_normalized_name ON games (normalized_name)")
+            for field in STATUS_FIELDS:
+                connection.execute(f"CREATE INDEX games_{field} ON games ({field})")
+
+            # FTS5 is compiled into most SQLite builds; without it, search falls back to LIKE
+            try:
+                connection.execute("CREATE VIRTUAL TABLE games_fts USING fts5("
+                                   "name, content='games', content_rowid='id')")
+                connection.execute("INSERT INTO games_fts (games_fts) VALUES ('rebuild')")
+                fts = '1'
+            except sqlite3.OperationalError:
+                fts = '0'
+
+            connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+                ('game_count', str(count)),
+                ('fts', fts),
+                ('source_mtime', ''),
+            ])
+            connection.commit()
+        finally:
+            connection.close()
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return temp_path, count
+
+
+def install_store(temp_path, db_filename, source_mtime=None):
+    """
+    Move a store built by stage_store into place, recording the modification
+    time of the CSV it was built from. The temporary file is removed on failure.
+    """
+    try:
+        connection = sqlite3.connect(temp_path)
+        try:
+            with connection:
+                connection.execute("UPDATE meta SET value = ? WHERE key = 'source_mtime'",
+                                   ('' if source_mtime is None else repr(source_mtime),))
+        finally:
+            connection.close()
+
+        os.chmod(temp_path, FILE_MODE)
+        os.replace(temp_path, db_filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def read_meta(db_filename):
+    """Return the store's metadata as a dictionary, or None if there is no usable store."""
+    if not os.path.exists(db_filename):
+        return None
+    try:
+        connection = sqlite3.connect(f"file:{db_filename}?mode=ro", uri=True)
+        try:
+            return dict(connection.execute("SELECT key, value FROM meta"))
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+
+
+def ensure_store(csv_filename, db_filename=None):
+    """
+    Make sure the SQLite store for a compatibility CSV exists and matches it,
+    rebuilding it from the CSV if it is missing or older than the CSV.
+    Returns the store path.
+    """
+    db_filename = db_filename or store_filename_for(csv_filename)
+    source_mtime = os.path.getmtime(csv_filename)
+
+    meta = read_meta(db_filename)
+    if meta is None or meta.get('source_mtime') != repr(source_mtime):
+        build_store(db_filename, iter_csv_rows(csv_filename), source_mtime)
+
+    return db_filename
+
+
+def _fts_query(query):
+    """
+    Turn free text into an FTS5 query: every word must appear, and the last
+    word is matched as a prefix so partially typed titles still match.
+    """
+    words = re.findall(r'\w+', query.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+    return ' '.join(terms)
+
+
+def search_games(db_filename, query, limit=20, filters=None):
+    """
+    Look up games by name without loading the whole database.
+
+    Exact matches on the name come first, then exact matches on the normalized
+    name, then full-text (or, without FTS5, substring) matches ranked by
+    relevance. filters maps status columns to required values, e.g.
+    {'native': 'Yes'}. Returns a list of dictionaries with the CSV columns.
+    """
+    filters = {field: value for field, value in (filters or {}).items() if field in STATUS_FIELDS}
+    filter_sql = ''.join(f" AND games.{field} = ?" for field in filters)
+    filter_args = list(filters.values())
+    select = f"SELECT games.id, {', '.join('games.' + field for field in COMPATIBILITY_FIELDS)} FROM games"
+
+    connection = sqlite3.connect(f"file:{db_filename}?mode=ro", uri=True)
+    try:
+        fts = connection.execute("SELECT value FROM meta WHERE key = 'fts'").fetchone()
+        fts = fts is not None and fts[0] == '1'
+
+        results = []
+        seen = set()
+
+        def collect(sql, args):
+            for row in connection.execute(sql, args):
+                if row[0] not in seen and len(results) < limit:
+                    seen.add(row[0])
+                    results.append(dict(zip(COMPATIBILITY_FIELDS, row[1:])))
+
+        query = (query or '').strip()
+        if not query:
+            collect(f"{select} WHERE 1 = 1{filter_sql} ORDER BY games.name_lower LIMIT ?", filter_args + [limit])
+            return results
+
+        collect(f"{select} WHERE games.name_lower = ?{filter_sql} LIMIT ?",
+                [query.lower()] + filter_args + [limit])
+        collect(f"{select} WHERE games.normalized_name = ?{filter_sql} LIMIT ?",
+                [normalize_game_name(query)] + filter_args + [limit])
+
+        if len(results) < limit:
+            fts_query = _fts_query(query)
+            if fts and fts_query:
+                collect(f"{select} JOIN games_fts ON games_fts.rowid = games.id "
+                        f"WHERE games_fts MATCH ?{filter_sql} ORDER BY games_fts.rank LIMIT ?",
+                        [fts_query] + filter_args + [limit + len(seen)])
+            else:
+                collect(f"{select} WHERE games.name_lower LIKE ? ESCAPE '\\'{filter_sql} "
+                        f"ORDER BY length(games.name) LIMIT ?",
+                        ['%' + re.sub(r'([%_\\])', r'\\\1', query.lower()) + '%'] + filter_args
+                        + [limit + len(seen)])
+
+        return results
+    finally:
+        connection.close()
@@ -0,0 +1,126 @@
+from array import array
+from collections import Counter
+from operator import attrgetter
+
+from storage import STATUS_FIELDS, STATUS_VALUES, GameRecord, status_code
+
+# Statuses that count as "runs this way"; Partial means it works with issues
+WORKING_STATUSES = ('Yes', 'Native', 'Partial')
+
+# Methods in order of preference when picking the best way to run a game
+METHOD_ORDER = STATUS_FIELDS
+
+# Best-method buckets for games with no working method
+NOT_WORKING = 'not_working'
+NO_INFORMATION = 'unknown'
+
+
+def status_columns(rows):
+    """
+    Turn result rows into one array of status codes per status column.
+    GameRecords already hold codes; dictionaries are encoded on the way.
+    """
+    rows = list(rows)
+    records = all(isinstance(row, GameRecord) for row in rows)
+    columns = {}
+    for field in STATUS_FIELDS:
+        if records:
+            codes = map(attrgetter('_' + field), rows)
+        else:
+            codes = (status_code(row.get(field)) for row in rows)
+        columns[field] = array('H', codes)
+    return columns
+
+
+def _best_method(codes, working_codes, empty_codes):
+    """Classify one combination of status codes (in STATUS_FIELDS order)."""
+    for field, code in zip(STATUS_FIELDS, codes):
+        if code in working_codes:
+            return field
+    if all(code in empty_codes for code in codes):
+        return NO_INFORMATION
+    return NOT_WORKING
+
+
+def summarize_columns(columns):
+    """
+    Aggregate status columns into per-status counts and best-method counts.
+
+    Rows are counted by their combination of status codes first (a single
+    pass in C via Counter over the zipped columns); only the few distinct
+    combinations are then classified in Python.
+    """
+    working_codes = {status_code(value) for value in WORKING_STATUSES}
+    empty_codes = {status_code(''), status_code('Unknown')}
+
+    combinations = Counter(zip(*(columns[field] for field in STATUS_FIELDS)))
+
+    best_method = dict.fromkeys(list(METHOD_ORDER) + [NOT_WORKING, NO_INFORMATION], 0)
+    for codes, count in combinations.items():
+        best_method[_best_method(codes, working_codes, empty_codes)] += count
+
+    return {
+        "games": len(columns[STATUS_FIELDS[0]]),
+        "by_status": {
+            field: {STATUS_VALUES[code]: count for code, count in Counter(columns[field]).most_common()}
+            for field in STATUS_FIELDS
+        },
+        "best_method": best_method,
+    }
+
+
+def summarize_games(rows):
+    """
+    Summarize one library's match results.
+
+    Returns a dictionary with the number of games, the count of each status
+    value per method ("by_status") and how many games run best under each
+    method ("best_method", where earlier methods in METHOD_ORDER win, plus
+    'not_working' and 'unknown').
+    """
+    return summarize_columns(status_columns(rows))
+
+
+def summarize_libraries(libraries):
+    """
+    Summarize several libraries, given as {label: rows}. Returns
+    {"libraries": {label: summary}, "total": summary over all of them}.
+    """
+    per_library = {label: status_columns(rows) for label, rows in libraries.items()}
+    combined = {field: array('H') for field in STATUS_FIELDS}
+    for columns in per_library.values():
+        for field in STATUS_FIELDS:
+            combined[field].extend(columns[field])
+
+    return {
+        "libraries": {label: summarize_columns(columns) for label, columns in per_library.items()},
+        "total": summarize_columns(combined),
+    }
+
+
+# Display names for the best_method and by_status keys
+LABELS = {
+    'native': 'Native', 'rosetta_2': 'Rosetta 2', 'crossover': 'CrossOver', 'wine': 'Wine',
+    'parallels': 'Parallels', 'linux_arm': 'Linux ARM',
+    NOT_WORKING: 'Not working', NO_INFORMATION: 'No information',
+}
+
+
+def format_summary(summary, title="Summary"):
+    """Render a summary as returned by summarize_games as plain text."""
+    games = summary["games"]
+    lines = [f"{title} ({games} games):", "-" * 80, "Best way to run:"]
+    for method, count in summary["best_method"].items():
+        share = count / games if games else 0
+        lines.append(f"  {LABELS[method]:<16} {count:>6}  {share:>6.1%}")
+
+    lines += ["", "Status counts per method:"]
+    for field, counts in summary["by_status"].items():
+        lines.append(f"  {LABELS[field]:<16} "
+                     + ', '.join(f"{value or '(blank)'}: {count}" for value, count in counts.items()))
+    return '\n'.join(lines)
+
+
+def print_summary(summary, title="Summary"):
+    """Print a summary as returned by summarize_games."""
+    print("\n" + format_summary(summary, title))
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_wiki_row(name, native='Yes', url=None):
+    return {'name': name, 'url': url or f"https://www.applegamingwiki.com/wiki/{name.replace(' ', '_')}",
+            'native': native, 'rosetta_2': 'Unknown', 'crossover': 'No', 'wine': '', 'parallels': 'Partial',
+            'linux_arm': 'Unknown'}
+
+
+@pytest.fixture
+def wiki_row():
+    """Build a compatibility row like the ones get_game_info extracts."""
+    return make_wiki_row
@@ -0,0 +1,49 @@
+from history import diff_versions, list_versions, record_snapshot
+from profiles import affected_profiles, check_profile
+from scrape import CompatibilityIndex
+from storage import GameRecord
+
+HADES_2 = "https://www.applegamingwiki.com/wiki/Hades_II"
+
+
+def test_game_count_counts_every_row(tmp_path, wiki_row):
+    history_filename = str(tmp_path / 'history.sqlite')
+    record_snapshot(history_filename, [wiki_row('Hades'), wiki_row('Hades'), wiki_row('Portal')])
+    assert [version['game_count'] for version in list_versions(history_filename)] == [3]
+
+
+def test_rows_sharing_a_name_are_diffed_separately(tmp_path, wiki_row):
+    history_filename = str(tmp_path / 'history.sqlite')
+    old = record_snapshot(history_filename, [wiki_row('Hades'), wiki_row('Hades', url=HADES_2), wiki_row('Portal')])
+    new = record_snapshot(history_filename, [wiki_row('Hades', 'Partial'), wiki_row('Hades', 'No', url=HADES_2)])
+
+    diff = diff_versions(history_filename, old, new)
+    assert diff['changed'] == [
+        {"name": 'Hades', "url": wiki_row('Hades')['url'], "changes": {'native': ['Yes', 'Partial']}},
+        {"name": 'Hades', "url": HADES_2, "changes": {'native': ['Yes', 'No']}},
+    ]
+    assert [game['name'] for game in diff['removed']] == ['Portal']
+    assert diff['added'] == []
+
+    newer = record_snapshot(history_filename, [wiki_row('Hades', 'No', url=HADES_2)])
+    diff = diff_versions(history_filename, new, newer)
+    assert diff['changed'] == []
+    assert [(game['name'], game['url']) for game in diff['removed']] == [('Hades', wiki_row('Hades')['url'])]
+
+
+def test_affected_profiles_tell_rows_sharing_a_name_apart(tmp_path, wiki_row):
+    history_filename = str(tmp_path / 'history.sqlite')
+    profiles_filename = str(tmp_path / 'profiles.sqlite')
+    rows = [wiki_row('Hades'), wiki_row('Hades', url=HADES_2)]
+    old = record_snapshot(history_filename, rows)
+    new = record_snapshot(history_filename, [rows[0], wiki_row('Hades', 'No', url=HADES_2)])
+
+    compatibility_data = [GameRecord.from_row(row) for row in rows]
+    index = CompatibilityIndex(compatibility_data)
+    # The first profile holds the row that changed only through its second game
+    check_profile(profiles_filename, '1', ['Hades', 'Hades'], compatibility_data, index)
+    check_profile(profiles_filename, '2', ['Hades'], compatibility_data, index)
+
+    profiles = affected_profiles(profiles_filename, diff_versions(history_filename, old, new))
+    assert [profile['steam_id'] for profile in profiles] == ['1']
+    assert [(game['url'], game['status']) for game in profiles[0]['games']] == [(HADES_2, 'changed')]
@@ -0,0 +1,192 @@
+import pytest
+
+from benchmark import make_benchmark_games, make_benchmark_library
+from scrape import (
+    TIER_NORMALIZED, TIER_PARTIAL_NORMALIZED, TIER_UNMATCHED, CompatibilityIndex, MatchCache, explain_matches,
+    match_games_with_compatibility, normalize_game_name
+)
+from storage import GameRecord
+
+
+def reference_match_games(steam_games, compatibility_data):
+    """
+    The original matcher, kept verbatim (minus the duplicated comments) as the
+    reference the indexed and cached matchers must agree with: each tier scans
+    every free entry and the first tier with a match wins.
+    """
+    matched_games = []
+    matched_compatibility_indices = set()
+
+    normalized_compatibility_data = []
+    for game in compatibility_data:
+        normalized_game = game.copy()
+        normalized_game['normalized_name'] = normalize_game_name(game['name'])
+        normalized_compatibility_data.append(normalized_game)
+
+    for steam_game in steam_games:
+        normalized_steam_game = normalize_game_name(steam_game)
+
+        if not steam_game.strip():
+            continue
+
+        # 1. Exact match on original name
+        found_match = False
+        for i, game in enumerate(compatibility_data):
+            if i in matched_compatibility_indices:
+                continue
+            if game['name'].lower() == steam_game.lower():
+                matched_games.append(game)
+                matched_compatibility_indices.add(i)
+                found_match = True
+                break
+        if found_match:
+            continue
+
+        # 2. Exact match on normalized name
+        for i, game in enumerate(normalized_compatibility_data):
+            if i in matched_compatibility_indices:
+                continue
+            if game['normalized_name'] == normalized_steam_game:
+                matched_games.append({k: v for k, v in game.items() if k != 'normalized_name'})
+                matched_compatibility_indices.add(i)
+                found_match = True
+                break
+        if found_match:
+            continue
+
+        # 3. Partial match on original name
+        best_match = None
+        best_match_index = -1
+        best_match_score = 0
+        for i, game in enumerate(compatibility_data):
+            if i in matched_compatibility_indices:
+                continue
+            score = 0
+            if steam_game.lower() in game['name'].lower():
+                score = len(steam_game) / len(game['name'])
+            elif game['name'].lower() in steam_game.lower():
+                score = len(game['name']) / len(steam_game)
+            if score > best_match_score:
+                best_match_score = score
+                best_match = game
+                best_match_index = i
+        if best_match and best_match_score > 0.5:
+            matched_games.append(best_match)
+            matched_compatibility_indices.add(best_match_index)
+            continue
+
+        # 4. Partial match on normalized name
+        best_match = None
+        best_match_index = -1
+        best_match_score = 0
+        for i, game in enumerate(normalized_compatibility_data):
+            if i in matched_compatibility_indices:
+                continue
+            score = 0
+            if normalized_steam_game in game['normalized_name']:
+                score = len(normalized_steam_game) / len(game['normalized_name'])
+            elif game['normalized_name'] in normalized_steam_game:
+                score = len(game['normalized_name']) / len(normalized_steam_game)
+            if score > best_match_score:
+                best_match_score = score
+                best_match = game
+                best_match_index = i
+        if best_match and best_match_score > 0.5:
+            matched_games.append({k: v for k, v in best_match.items() if k != 'normalized_name'})
+            matched_compatibility_indices.add(best_match_index)
+            continue
+
+        # 5. No match found
+        matched_games.append({
+            'name': steam_game, 'url': '', 'native': 'Unknown', 'rosetta_2': 'Unknown',
+            'crossover': 'Unknown', 'wine': 'Unknown', 'parallels': 'Unknown', 'linux_arm': 'Unknown'
+        })
+
+    return matched_games
+
+
+# Names that exercise every tier: bare years (which normalize to nothing),
+# editions, articles, duplicated titles and substrings of each other
+WIKI_NAMES = [
+    '1993', 'Portal', 'Portal 2', 'The Witcher 3: Wild Hunt', 'Witcher 3', 'DOOM', 'DOOM Eternal', 'Hades',
+    'Hades', 'Half-Life', 'Half-Life 2', 'Stardew Valley', '2064: Read Only Memories', 'Civilization VI',
+    'Sid Meier\'s Civilization VI', 'Dead Cells', 'Cells',
+]
+
+STEAM_LIBRARY = [
+    '1993', 'Portal 2', 'Portal', 'The Witcher 3: Wild Hunt - Game of the Year Edition', 'Witcher 3', 'Doom',
+    'DOOM Eternal Deluxe Edition', 'Hades', 'Hades', 'Hades', 'Half-Life 2: Episode One', 'Half Life',
+    'Stardew Valley', '2064', 'Civilization VI', 'Dead Cells', 'Unlisted Game', '', '   ', '2020',
+]
+
+
+def as_dicts(rows):
+    return [dict(row) for row in rows]
+
+
+@pytest.fixture(scope='module')
+def synthetic():
+    games = make_benchmark_games(1500, seed=3)
+    library = make_benchmark_library([game['name'] for game in games], 400, seed=5)
+    return games, library
+
+
+def test_handpicked_names_match_reference(wiki_row):
+    wiki = [wiki_row(name) for name in WIKI_NAMES]
+    expected = reference_match_games(STEAM_LIBRARY, wiki)
+    assert as_dicts(match_games_with_compatibility(STEAM_LIBRARY, wiki)) == expected
+
+
+def test_name_that_normalizes_to_nothing_does_not_break_matching(wiki_row):
+    wiki = [wiki_row('1993'), wiki_row('Portal 2')]
+    matched = match_games_with_compatibility(['1993', 'Portal 2'], wiki)
+    assert [game['name'] for game in matched] == ['1993', 'Portal 2']
+
+
+@pytest.mark.parametrize('records', [False, True])
+@pytest.mark.parametrize('cached', [False, True])
+def test_synthetic_library_matches_reference(synthetic, records, cached):
+    games, library = synthetic
+    expected = reference_match_games(library, games)
+
+    compatibility_data = [GameRecord.from_row(game) for game in games] if records else games
+    index = CompatibilityIndex(compatibility_data)
+    cache = MatchCache() if cached else None
+    # Twice, so the cached run also covers names served from the cache
+    for _ in range(2 if cached else 1):
+        matched = match_games_with_compatibility(library, compatibility_data, index, cache)
+        assert as_dicts(matched) == expected
+
+
+def test_explain_counts_each_entry_once(wiki_row):
+    # "Hades" matches the same entry in all four tiers
+    index = CompatibilityIndex([wiki_row('Hades'), wiki_row('Portal')])
+    assignments, explanations, _ = explain_matches(['Hades', 'Hades'], index)
+
+    assert [match for _, match in assignments] == [(0, 1), None]
+    assert (explanations[0]['candidates'], explanations[0]['skipped_taken']) == (1, 0)
+    assert (explanations[1]['candidates'], explanations[1]['skipped_taken']) == (1, 1)
+
+
+def test_cache_ranks_tiers_only_as_far_as_needed(tmp_path, wiki_row):
+    wiki = [wiki_row('Hades'), wiki_row('Hades II')]
+    index = CompatibilityIndex(wiki)
+    cache = MatchCache(filename=str(tmp_path / 'match_cache.json'))
+
+    match_games_with_compatibility(['Hades'], wiki, index, cache)
+    assert cache.get(index.version, 'Hades') == (((0, 1),), TIER_NORMALIZED)
+
+    # The second copy finds the exact match taken, so the partial tiers are ranked and cached
+    matched = match_games_with_compatibility(['Hades', 'Hades'], wiki, index, cache)
+    assert [game['name'] for game in matched] == ['Hades', 'Hades II']
+    candidates, next_tier = cache.get(index.version, 'Hades')
+    assert (candidates[-1], next_tier) == ((1, 3), TIER_PARTIAL_NORMALIZED)
+
+    cache.save()
+    assert MatchCache(filename=cache.filename).get(index.version, 'Hades') == (candidates, next_tier)
+
+
+def test_cache_entries_saved_as_complete_rankings_still_load(tmp_path):
+    filename = tmp_path / 'match_cache.json'
+    filename.write_text('{"entries": [["v1", "Hades", [[0, 1]]]]}')
+    assert MatchCache(filename=str(filename)).get('v1', 'Hades') == (((0, 1),), TIER_UNMATCHED)
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from benchmark import make_benchmark_games, make_benchmark_library
+from profiles import check_profile
+from scrape import CompatibilityIndex, MatchCache, match_games_with_compatibility
+from storage import GameRecord
+
+
+def check(tmp_path, library, compatibility_data, index, cache=None):
+    return check_profile(str(tmp_path / 'profiles.sqlite'), '1', library, compatibility_data, index, cache)
+
+
+def test_added_game_that_would_take_a_kept_games_entry_is_rematched(tmp_path, wiki_row):
+    compatibility_data = [GameRecord.from_row(wiki_row('Portal 2'))]
+    index = CompatibilityIndex(compatibility_data)
+
+    check(tmp_path, ['Portal'], compatibility_data, index)
+    matched, recheck = check(tmp_path, ['Portal 2', 'Portal'], compatibility_data, index)
+
+    assert recheck['mode'] == 'full'
+    assert [game['native'] for game in matched] == ['Yes', 'Unknown']
+
+
+def test_added_game_is_patched_in(tmp_path, wiki_row):
+    compatibility_data = [GameRecord.from_row(wiki_row(name)) for name in ['Portal', 'Portal 2', 'Hades']]
+    index = CompatibilityIndex(compatibility_data)
+
+    check(tmp_path, ['Portal', 'Hades'], compatibility_data, index)
+    matched, recheck = check(tmp_path, ['Portal', 'Portal 2', 'Hades'], compatibility_data, index)
+
+    assert (recheck['mode'], recheck['added']) == ('incremental', 1)
+    assert [game['name'] for game in matched] == ['Portal', 'Portal 2', 'Hades']
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_rechecks_match_a_full_rematch(tmp_path, cached):
+    games = [GameRecord.from_row(game) for game in make_benchmark_games(800, seed=11)]
+    names = [game['name'] for game in games]
+    index = CompatibilityIndex(games)
+    cache = MatchCache() if cached else None
+    rng = random.Random(2)
+
+    library = make_benchmark_library(names, 150, seed=4)
+    for step in range(15):
+        # Buy a few games (anywhere in the list), sometimes lose one
+        for steam_game in make_benchmark_library(names, rng.randint(1, 6), seed=100 + step):
+            library.insert(rng.randrange(len(library) + 1), steam_game)
+        if rng.random() < 0.3:
+            library.pop(rng.randrange(len(library)))
+
+        matched, _ = check(tmp_path, library, games, index, cache)
+        expected = match_games_with_compatibility(library, games, index)
+        assert [dict(game) for game in matched] == [dict(game) for game in expected]
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+import scrape
+from profiles import check_profile, load_profile
+from scrape import CompatibilityIndex, SteamLibraryIncomplete, iter_steam_games
+
+GAMES_XML = b"<gamesList><games>" + b"".join(
+    f"<game><appID>{appid}</appID><name>Game {appid}</name></game>".encode() for appid in range(1, 6)
+) + b"</games></gamesList>"
+
+
+def stream_pages(xml_chunks, page_chunks=()):
+    """Stand-in for _stream_steam_page serving the XML list and the games page."""
+    def stream(url):
+        chunks = xml_chunks if 'xml=1' in url else page_chunks
+        return 200, (chunk() if callable(chunk) else chunk for chunk in chunks)
+    return stream
+
+
+def connection_reset():
+    raise ConnectionError("Connection reset by peer")
+
+
+def test_complete_library_is_yielded(monkeypatch):
+    monkeypatch.setattr(scrape, '_stream_steam_page', stream_pages([GAMES_XML[:70], GAMES_XML[70:]]))
+    assert [game['name'] for game in iter_steam_games('1')] == [f"Game {appid}" for appid in range(1, 6)]
+
+
+def test_failure_before_any_game_falls_back_to_the_games_page(monkeypatch):
+    page = b'<script>var rgGames = [{"appid":7,"name":"Game 7"}];</script>'
+    monkeypatch.setattr(scrape, '_stream_steam_page', stream_pages([connection_reset], [page]))
+    assert [game['name'] for game in iter_steam_games('1')] == ["Game 7"]
+
+
+def test_failure_after_some_games_raises(monkeypatch):
+    monkeypatch.setattr(scrape, '_stream_steam_page', stream_pages([GAMES_XML[:150], connection_reset]))
+    with pytest.raises(SteamLibraryIncomplete):
+        list(iter_steam_games('1'))
+
+
+def test_truncated_library_is_not_stored(monkeypatch, tmp_path):
+    monkeypatch.setattr(scrape, '_stream_steam_page', stream_pages([GAMES_XML[:150], connection_reset]))
+    profiles_filename = str(tmp_path / 'profiles.sqlite')
+    steam_games = (game['name'] for game in iter_steam_games('1'))
+
+    with pytest.raises(SteamLibraryIncomplete):
+        check_profile(profiles_filename, '1', steam_games, [], CompatibilityIndex([]))
+    assert not os.path.exists(profiles_filename) or load_profile(profiles_filename, '1') is None
+
+
+def test_rate_limited_vanity_lookup_is_not_reported_as_invalid(monkeypatch):
+    class RejectingSession:
+        def get(self, url, *args, **kwargs):
+            raise scrape.RateLimitExceeded('steamcommunity.com', 12.0)
+
+    monkeypatch.setattr(scrape, 'get_http_session', lambda: RejectingSession())
+    with pytest.raises(scrape.RateLimitExceeded):
+        scrape.extract_steam_id('https://steamcommunity.com/id/someone')
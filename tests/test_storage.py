@@ -0,0 +1,12 @@
+import pytest
+
+from storage import GameRecord
+
+
+def test_records_are_read_only(wiki_row):
+    record = GameRecord.from_row(wiki_row('Hades'))
+    with pytest.raises(AttributeError):
+        record.name = 'Portal'
+    with pytest.raises(AttributeError):
+        record._native = 99
+    assert record.as_dict() == wiki_row('Hades')